@@ -1,18 +1,211 @@
 import discord
 from discord import ui
 import logging
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from bot.alias_manager import AliasManager
 
 logger = logging.getLogger(__name__)
 
+# Seconds before an unsubmitted creation modal is dropped from discord.py's modal store
+MODAL_TIMEOUT = 900
+
+# Placeholder avatar used when a character is created without an image
+DEFAULT_AVATAR_URL = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+@dataclass(slots=True)
+class CharacterDraft:
+    """Character details collected across the creation modals"""
+    name: str
+    trigger: str
+    user_id: int
+    guild_id: int
+    class_level: Optional[str] = None
+    race: Optional[str] = None
+    group_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    description: Optional[str] = None
+    pronouns: Optional[str] = None
+    age: Optional[str] = None
+    alignment: Optional[str] = None
+    backstory: Optional[str] = None
+    goals: Optional[str] = None
+    notes: Optional[str] = None
+    dndbeyond_url: Optional[str] = None
+    personality: Optional[str] = None
+    
+    def as_alias_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for AliasManager.create_alias, skipping unset optional fields"""
+        kwargs = {
+            'user_id': self.user_id,
+            'guild_id': self.guild_id,
+            'name': self.name,
+            'trigger': self.trigger,
+            'group_name': self.group_name,
+        }
+        if self.class_level:
+            kwargs['character_class'] = self.class_level
+        for field in ('race', 'pronouns', 'age', 'alignment', 'description', 'personality',
+                      'backstory', 'goals', 'notes', 'dndbeyond_url'):
+            value = getattr(self, field)
+            if value is not None:
+                kwargs[field] = value
+        return kwargs
+
+# Fields shown on the final "Character Created" embed, in display order:
+# (field name, CharacterDraft attribute, inline, max length, value template).
+# A key of None marks where the combined DETAIL_FIELD_SPECS field goes.
+FINAL_FIELD_SPECS = (
+    ("⚔️ Class", "class_level", True, None, None),
+    ("🧬 Race", "race", True, None, None),
+    ("🗣️ Pronouns", "pronouns", True, None, None),
+    ("📁 Group", "group_name", True, None, None),
+    ("📊 Details", None, False, None, None),
+    ("👤 Appearance", "description", False, 1000, None),
+    ("🎭 Personality", "personality", False, 1000, None),
+    ("📖 Backstory", "backstory", False, 1000, None),
+    ("🎯 Goals", "goals", False, 1000, None),
+    ("📝 Notes", "notes", False, 1000, None),
+    ("🌐 D&D Beyond", "dndbeyond_url", False, None, "[View Character Sheet]({})"),
+)
+
+# Short details joined into a single " • " separated field: (label, CharacterDraft attribute)
+DETAIL_FIELD_SPECS = (
+    ("Age", "age"),
+    ("Alignment", "alignment"),
+)
+
+# Optional values listed in the "Basic Info Saved" summary: (label, CharacterDraft attribute)
+BASIC_SUMMARY_SPECS = (
+    ("Class", "class_level"),
+    ("Race", "race"),
+    ("Group", "group_name"),
+)
+
+# AliasUploadView lives in bot.alias_commands, which imports this module;
+# resolve it once on first use and keep it for later character creations.
+_AliasUploadView = None
+
+def _get_upload_view():
+    """Return the AliasUploadView class, importing it on first call"""
+    global _AliasUploadView
+    if _AliasUploadView is None:
+        from bot.alias_commands import AliasUploadView
+        _AliasUploadView = AliasUploadView
+    return _AliasUploadView
+
+# Usage hints for bracket-style triggers, keyed by (first char, last char)
+_WRAPPED_USAGE_EXAMPLES = {
+    ('[', ']'): "Type `[Hello everyone!]` to post as {name}",
+    ('(', ')'): "Type `(Hello everyone!)` to post as {name}",
+}
+
+def _usage_example(trigger: str, name: str) -> str:
+    """Return a one-line example of posting as a character with the given trigger"""
+    template = _WRAPPED_USAGE_EXAMPLES.get((trigger[:1], trigger[-1:]))
+    if template:
+        return template.format(name=name)
+    if trigger[-1:] == ':':
+        return f"Type `{trigger}Hello everyone!` to post as {name}"
+    return f"Type `{trigger} Hello everyone!` to post as {name}"
+
+async def _safe_error(interaction: discord.Interaction, message: str):
+    """Send an ephemeral error message, using a followup if the interaction was already answered"""
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
+def _build_basic_info_embed(draft: CharacterDraft) -> discord.Embed:
+    """Build the "Basic Info Saved" embed shown after the first creation modal"""
+    embed = discord.Embed(
+        title="✅ Basic Info Saved",
+        color=discord.Color.blue(),
+        description=f"Character **{draft.name}** basic info recorded!"
+    )
+    embed.add_field(name="Next Step", value="Click the button below to continue with appearance details.", inline=False)
+    
+    # One multi-line field keeps the payload small compared to an inline field per value
+    parts = [f"**Name**: {draft.name}", f"**Trigger**: `{draft.trigger}`"]
+    for label, attr in BASIC_SUMMARY_SPECS:
+        value = getattr(draft, attr)
+        if value:
+            parts.append(f"**{label}**: {value}")
+    embed.add_field(name="Summary", value="\n".join(parts), inline=False)
+    return embed
+
+def _build_appearance_embed(draft: CharacterDraft) -> discord.Embed:
+    """Build the "Appearance Details Saved" embed shown after the second creation modal"""
+    embed = discord.Embed(
+        title="✅ Appearance Details Saved",
+        color=discord.Color.blue(),
+        description=f"Character **{draft.name}** appearance recorded!"
+    )
+    embed.add_field(name="Final Step", value="Click the button below to add backstory and complete creation.", inline=False)
+    
+    description = draft.description
+    if description:
+        if len(description) > 100:
+            description = description[:100] + "..."
+        embed.add_field(name="Description", value=description, inline=False)
+    
+    # Show additional character details
+    details = []
+    if draft.age:
+        details.append(f"Age: {draft.age}")
+    if draft.alignment:
+        details.append(f"Alignment: {draft.alignment}")
+    if details:
+        embed.add_field(name="Character Details", value=" • ".join(details), inline=False)
+    return embed
+
+def _build_skipped_appearance_embed(draft: CharacterDraft) -> discord.Embed:
+    """Build the embed shown when the appearance step is skipped"""
+    embed = discord.Embed(
+        title="⏭️ Skipped Appearance Details",
+        color=discord.Color.blue(),
+        description=f"Character **{draft.name}** appearance details skipped."
+    )
+    embed.add_field(name="Next Step", value="Choose whether to add background details or finish creating your character.", inline=False)
+    return embed
+
+# CharacterDraft attributes each summary embed is built from; a cached embed is
+# reused until one of these values changes
+BASIC_INFO_EMBED_KEYS = ('name', 'trigger', 'class_level', 'race', 'group_name')
+APPEARANCE_EMBED_KEYS = ('name', 'description', 'age', 'alignment')
+
+class _CachedEmbed:
+    """Memoizes an embed built from a CharacterDraft, rebuilding only when its source keys change"""
+    
+    __slots__ = ('builder', 'keys', '_embed', '_snapshot')
+    
+    def __init__(self, builder, keys):
+        self.builder = builder
+        self.keys = keys
+        self._embed = None
+        self._snapshot = None
+    
+    def get(self, draft: CharacterDraft) -> discord.Embed:
+        snapshot = tuple(getattr(draft, key) for key in self.keys)
+        if self._embed is None or snapshot != self._snapshot:
+            self._embed = self.builder(draft)
+            self._snapshot = snapshot
+        return self._embed
+
 class ContinueToAppearanceView(ui.View):
     """View with button to continue to appearance modal"""
     
-    def __init__(self, alias_manager: AliasManager, character_data: Dict[str, Any]):
+    def __init__(self, alias_manager: AliasManager, character_data: CharacterDraft):
         super().__init__(timeout=300)
         self.alias_manager = alias_manager
         self.character_data = character_data
+        self._saved_embed = _CachedEmbed(_build_basic_info_embed, BASIC_INFO_EMBED_KEYS)
+        self._skipped_embed = _CachedEmbed(_build_skipped_appearance_embed, ('name',))
+    
+    @property
+    def saved_embed(self) -> discord.Embed:
+        """The "Basic Info Saved" embed for this character"""
+        return self._saved_embed.get(self.character_data)
     
     @ui.button(label="Continue to Appearance", style=discord.ButtonStyle.primary, emoji="👤")
     async def continue_to_appearance(self, interaction: discord.Interaction, button: ui.Button):
@@ -24,23 +217,22 @@ class ContinueToAppearanceView(ui.View):
     async def skip_appearance(self, interaction: discord.Interaction, button: ui.Button):
         """Skip appearance and show next step options"""
         view = ContinueToBackstoryView(self.alias_manager, self.character_data)
-        
-        embed = discord.Embed(
-            title="⏭️ Skipped Appearance Details",
-            color=discord.Color.blue(),
-            description=f"Character **{self.character_data['name']}** appearance details skipped."
-        )
-        embed.add_field(name="Next Step", value="Choose whether to add background details or finish creating your character.", inline=False)
-        
+        embed = self._skipped_embed.get(self.character_data)
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
 class ContinueToBackstoryView(ui.View):
     """View with button to continue to backstory modal"""
     
-    def __init__(self, alias_manager: AliasManager, character_data: Dict[str, Any]):
+    def __init__(self, alias_manager: AliasManager, character_data: CharacterDraft):
         super().__init__(timeout=300)
         self.alias_manager = alias_manager
         self.character_data = character_data
+        self._saved_embed = _CachedEmbed(_build_appearance_embed, APPEARANCE_EMBED_KEYS)
+    
+    @property
+    def saved_embed(self) -> discord.Embed:
+        """The "Appearance Details Saved" embed for this character"""
+        return self._saved_embed.get(self.character_data)
     
     @ui.button(label="Continue to Background", style=discord.ButtonStyle.primary, emoji="📖")
     async def continue_to_backstory(self, interaction: discord.Interaction, button: ui.Button):
@@ -54,22 +246,8 @@ class ContinueToBackstoryView(ui.View):
         try:
             # Create the alias with current data (skipping background info)
             # Ensure avatar_url is never None
-            avatar_url = self.character_data.get('avatar_url') or "https://cdn.discordapp.com/embed/avatars/0.png"
-            alias = self.alias_manager.create_alias(
-                user_id=self.character_data['user_id'],
-                guild_id=self.character_data['guild_id'],
-                name=self.character_data['name'],
-                trigger=self.character_data['trigger'],
-                avatar_url=avatar_url,
-                group_name=self.character_data.get('group_name'),
-                character_class=self.character_data.get('class_level'),
-                race=self.character_data.get('race'),
-                pronouns=self.character_data.get('pronouns'),
-                age=self.character_data.get('age'),
-                alignment=self.character_data.get('alignment'),
-                description=self.character_data.get('description'),
-                personality=self.character_data.get('personality')
-            )
+            avatar_url = self.character_data.avatar_url or DEFAULT_AVATAR_URL
+            alias = self.alias_manager.create_alias(avatar_url=avatar_url, **self.character_data.as_alias_kwargs())
             
             embed = discord.Embed(
                 title=f"✅ Character Created: {alias.name}",
@@ -80,29 +258,29 @@ class ContinueToBackstoryView(ui.View):
             embed.set_footer(text="Use '/alias edit' to add more details anytime!")
             
             # If no custom avatar was provided, show upload option
-            if not self.character_data.get('avatar_url'):
-                from bot.alias_commands import AliasUploadView
-                view = AliasUploadView(self.alias_manager, alias.name, interaction.client)
+            if not self.character_data.avatar_url:
+                view = _get_upload_view()(self.alias_manager, alias.name, interaction.client)
                 embed.add_field(name="💡 Add Avatar", value="Upload a custom avatar using the button below!", inline=False)
                 await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             else:
                 embed.set_thumbnail(url=alias.avatar_url)
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             
-        except Exception as e:
-            logger.error(f"Error finishing character creation: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred while creating your character. Please try again.", 
-                ephemeral=True
-            )
+        except Exception:
+            logger.exception("Error finishing character creation")
+            await _safe_error(interaction, "❌ An error occurred while creating your character. Please try again.")
 
 class CharacterBasicModal(ui.Modal, title='Character Creation - Basic Info'):
     """First modal: Basic character information"""
     
     def __init__(self, alias_manager: AliasManager):
-        super().__init__()
+        super().__init__(timeout=MODAL_TIMEOUT)
         self.alias_manager = alias_manager
     
+    async def on_timeout(self):
+        """Release references held by an abandoned modal"""
+        self.alias_manager = None
+    
     character_name = ui.TextInput(
         label='Character Name',
         placeholder='Enter your character\'s name (e.g., Kael Brightblade)',
@@ -142,50 +320,37 @@ class CharacterBasicModal(ui.Modal, title='Character Creation - Basic Info'):
         """Store basic info and proceed to appearance modal"""
         try:
             # Store data for next step
-            character_data = {
-                'name': str(self.character_name.value),
-                'trigger': str(self.trigger_pattern.value),
-                'class_level': str(self.character_class.value).strip() if self.character_class.value else None,
-                'race': str(self.race.value).strip() if self.race.value else None,
-                'group_name': str(self.group_name.value).strip() if self.group_name.value else None,
-                'user_id': interaction.user.id,
-                'guild_id': interaction.guild.id if interaction.guild else 0
-            }
+            character_data = CharacterDraft(
+                name=self.character_name.value,
+                trigger=self.trigger_pattern.value,
+                class_level=self.character_class.value.strip() if self.character_class.value else None,
+                race=self.race.value.strip() if self.race.value else None,
+                group_name=self.group_name.value.strip() if self.group_name.value else None,
+                user_id=interaction.user.id,
+                guild_id=interaction.guild.id if interaction.guild else 0
+            )
             
             # Create a view with a button to continue to the next step
             view = ContinueToAppearanceView(self.alias_manager, character_data)
+            await interaction.response.send_message(embed=view.saved_embed, view=view, ephemeral=True)
             
-            embed = discord.Embed(
-                title="✅ Basic Info Saved",
-                color=discord.Color.blue(),
-                description=f"Character **{character_data['name']}** basic info recorded!"
-            )
-            embed.add_field(name="Next Step", value="Click the button below to continue with appearance details.", inline=False)
-            embed.add_field(name="Character Name", value=character_data['name'], inline=True)
-            embed.add_field(name="Trigger", value=f"`{character_data['trigger']}`", inline=True)
-            if character_data.get('class_level'):
-                embed.add_field(name="Class", value=character_data['class_level'], inline=True)
-            if character_data.get('race'):
-                embed.add_field(name="Race", value=character_data['race'], inline=True)
-            if character_data.get('group_name'):
-                embed.add_field(name="Group", value=character_data['group_name'], inline=True)
-            
-            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
-            
-        except Exception as e:
-            logger.error(f"Error in basic character modal: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred. Please try again.", ephemeral=True
-            )
+        except Exception:
+            logger.exception("Error in basic character modal")
+            await _safe_error(interaction, "❌ An error occurred. Please try again.")
 
 class CharacterAppearanceModal(ui.Modal, title='Character Creation - Appearance'):
     """Second modal: Character appearance and avatar"""
     
-    def __init__(self, alias_manager: AliasManager, character_data: Dict[str, Any]):
-        super().__init__()
+    def __init__(self, alias_manager: AliasManager, character_data: CharacterDraft):
+        super().__init__(timeout=MODAL_TIMEOUT)
         self.alias_manager = alias_manager
         self.character_data = character_data
     
+    async def on_timeout(self):
+        """Release references held by an abandoned modal"""
+        self.alias_manager = None
+        self.character_data = None
+    
     avatar_url = ui.TextInput(
         label='Avatar Image URL (Optional)',
         placeholder='Paste image URL here, or leave blank to upload later',
@@ -228,7 +393,7 @@ class CharacterAppearanceModal(ui.Modal, title='Character Creation - Appearance'
         """Store appearance info and proceed to backstory modal"""
         try:
             # Validate age if provided
-            age_value = str(self.age.value).strip() if self.age.value else None
+            age_value = self.age.value.strip() if self.age.value else None
             if age_value:
                 try:
                     age_num = int(age_value)
@@ -246,52 +411,34 @@ class CharacterAppearanceModal(ui.Modal, title='Character Creation - Appearance'
                     return
             
             # Add appearance data
-            self.character_data.update({
-                'avatar_url': str(self.avatar_url.value).strip() if self.avatar_url.value else None,
-                'description': str(self.description.value).strip() if self.description.value else None,
-                'pronouns': str(self.pronouns.value).strip() if self.pronouns.value else None,
-                'age': age_value,
-                'alignment': str(self.alignment.value).strip() if self.alignment.value else None
-            })
+            draft = self.character_data
+            draft.avatar_url = self.avatar_url.value.strip() if self.avatar_url.value else None
+            draft.description = self.description.value.strip() if self.description.value else None
+            draft.pronouns = self.pronouns.value.strip() if self.pronouns.value else None
+            draft.age = age_value
+            draft.alignment = self.alignment.value.strip() if self.alignment.value else None
             
             # Create a view with a button to continue to the final step
-            view = ContinueToBackstoryView(self.alias_manager, self.character_data)
-            
-            embed = discord.Embed(
-                title="✅ Appearance Details Saved",
-                color=discord.Color.blue(),
-                description=f"Character **{self.character_data['name']}** appearance recorded!"
-            )
-            embed.add_field(name="Final Step", value="Click the button below to add backstory and complete creation.", inline=False)
-            
-            if self.character_data.get('description'):
-                embed.add_field(name="Description", value=self.character_data['description'][:100] + "..." if len(self.character_data['description']) > 100 else self.character_data['description'], inline=False)
-            
-            # Show additional character details
-            details = []
-            if self.character_data.get('age'):
-                details.append(f"Age: {self.character_data['age']}")
-            if self.character_data.get('alignment'):
-                details.append(f"Alignment: {self.character_data['alignment']}")
-            if details:
-                embed.add_field(name="Character Details", value=" • ".join(details), inline=False)
-            
-            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+            view = ContinueToBackstoryView(self.alias_manager, draft)
+            await interaction.response.send_message(embed=view.saved_embed, view=view, ephemeral=True)
             
-        except Exception as e:
-            logger.error(f"Error in appearance character modal: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred. Please try again.", ephemeral=True
-            )
+        except Exception:
+            logger.exception("Error in appearance character modal")
+            await _safe_error(interaction, "❌ An error occurred. Please try again.")
 
 class CharacterBackstoryModal(ui.Modal, title='Character Creation - Background'):
     """Third modal: Character backstory and final creation"""
     
-    def __init__(self, alias_manager: AliasManager, character_data: Dict[str, Any]):
-        super().__init__()
+    def __init__(self, alias_manager: AliasManager, character_data: CharacterDraft):
+        super().__init__(timeout=MODAL_TIMEOUT)
         self.alias_manager = alias_manager
         self.character_data = character_data
     
+    async def on_timeout(self):
+        """Release references held by an abandoned modal"""
+        self.alias_manager = None
+        self.character_data = None
+    
     backstory = ui.TextInput(
         label='Backstory (Optional)',
         style=discord.TextStyle.paragraph,
@@ -335,147 +482,69 @@ class CharacterBackstoryModal(ui.Modal, title='Character Creation - Background')
         """Complete character creation with all collected data"""
         try:
             # Add final data
-            self.character_data.update({
-                'backstory': str(self.backstory.value).strip() if self.backstory.value else None,
-                'goals': str(self.goals.value).strip() if self.goals.value else None,
-                'notes': str(self.notes.value).strip() if self.notes.value else None,
-                'dndbeyond_url': str(self.dndbeyond_url.value).strip() if self.dndbeyond_url.value else None,
-                'personality': str(self.personality.value).strip() if self.personality.value else None
-            })
+            draft = self.character_data
+            draft.backstory = self.backstory.value.strip() if self.backstory.value else None
+            draft.goals = self.goals.value.strip() if self.goals.value else None
+            draft.notes = self.notes.value.strip() if self.notes.value else None
+            draft.dndbeyond_url = self.dndbeyond_url.value.strip() if self.dndbeyond_url.value else None
+            draft.personality = self.personality.value.strip() if self.personality.value else None
             
             # Create the character alias with all collected data
-            avatar_url = self.character_data.get('avatar_url') or "https://cdn.discordapp.com/embed/avatars/0.png"
+            avatar_url = draft.avatar_url or DEFAULT_AVATAR_URL
             
-            alias = self.alias_manager.create_alias(
-                user_id=self.character_data['user_id'],
-                guild_id=self.character_data['guild_id'],
-                name=self.character_data['name'],
-                trigger=self.character_data['trigger'],
-                avatar_url=avatar_url,
-                group_name=self.character_data.get('group_name'),
-                character_class=self.character_data.get('class_level'),
-                race=self.character_data.get('race'),
-                pronouns=self.character_data.get('pronouns'),
-                age=self.character_data.get('age'),
-                alignment=self.character_data.get('alignment'),
-                description=self.character_data.get('description'),
-                personality=self.character_data.get('personality'),
-                backstory=self.character_data.get('backstory'),
-                goals=self.character_data.get('goals'),
-                notes=self.character_data.get('notes'),
-                dndbeyond_url=self.character_data.get('dndbeyond_url')
-            )
+            alias = self.alias_manager.create_alias(avatar_url=avatar_url, **draft.as_alias_kwargs())
             
             # Store additional character data (would need database schema extension)
             # For now, we'll create a detailed embed showing all the info
             
-            embed = discord.Embed(
-                title=f"✅ Character Created: {alias.name}",
-                color=discord.Color.green(),
-                description="Your character has been successfully registered!"
-            )
-            
-            # Basic info
-            embed.add_field(name="🎯 Trigger", value=f"`{alias.trigger}`", inline=True)
-            if self.character_data.get('class_level'):
-                embed.add_field(name="⚔️ Class", value=self.character_data['class_level'], inline=True)
-            if self.character_data.get('race'):
-                embed.add_field(name="🧬 Race", value=self.character_data['race'], inline=True)
-            if self.character_data.get('pronouns'):
-                embed.add_field(name="🗣️ Pronouns", value=self.character_data['pronouns'], inline=True)
-            if self.character_data.get('group_name'):
-                embed.add_field(name="📁 Group", value=self.character_data['group_name'], inline=True)
-            
-            # Additional character info section
-            details = []
-            if self.character_data.get('age'):
-                details.append(f"Age: {self.character_data['age']}")
-            if self.character_data.get('alignment'):
-                details.append(f"Alignment: {self.character_data['alignment']}")
-            if details:
-                embed.add_field(name="📊 Details", value=" • ".join(details), inline=False)
-            
-            # Detailed info
-            if self.character_data.get('description'):
-                embed.add_field(
-                    name="👤 Appearance", 
-                    value=self.character_data['description'][:1000], 
-                    inline=False
-                )
-            
-            if self.character_data.get('personality'):
-                embed.add_field(
-                    name="🎭 Personality", 
-                    value=self.character_data['personality'][:1000], 
-                    inline=False
-                )
-            
-            if self.character_data.get('backstory'):
-                embed.add_field(
-                    name="📖 Backstory", 
-                    value=self.character_data['backstory'][:1000], 
-                    inline=False
-                )
-            
-            if self.character_data.get('goals'):
-                embed.add_field(
-                    name="🎯 Goals", 
-                    value=self.character_data['goals'][:1000], 
-                    inline=False
-                )
-            
-            if self.character_data.get('notes'):
-                embed.add_field(
-                    name="📝 Notes", 
-                    value=self.character_data['notes'][:1000], 
-                    inline=False
-                )
-            
-            # D&D Beyond link
-            if self.character_data.get('dndbeyond_url'):
-                embed.add_field(
-                    name="🌐 D&D Beyond", 
-                    value=f"[View Character Sheet]({self.character_data['dndbeyond_url']})", 
-                    inline=False
-                )
+            # Basic info, details summary and long-form fields, in display order
+            fields = [{"name": "🎯 Trigger", "value": f"`{alias.trigger}`", "inline": True}]
+            for name, key, inline, cap, template in FINAL_FIELD_SPECS:
+                if key is None:
+                    details = []
+                    for label, attr in DETAIL_FIELD_SPECS:
+                        detail = getattr(draft, attr)
+                        if detail:
+                            details.append(f"{label}: {detail}")
+                    if details:
+                        fields.append({"name": name, "value": " • ".join(details), "inline": inline})
+                    continue
+                value = getattr(draft, key)
+                if not value:
+                    continue
+                if cap:
+                    value = value[:cap]
+                fields.append({"name": name, "value": template.format(value) if template else value, "inline": inline})
             
             # Usage example
-            def get_usage_example(trigger: str) -> str:
-                if trigger.startswith('[') and trigger.endswith(']'):
-                    return f"Type `[Hello everyone!]` to post as {alias.name}"
-                elif trigger.startswith('(') and trigger.endswith(')'):
-                    return f"Type `(Hello everyone!)` to post as {alias.name}"
-                elif trigger.endswith(':'):
-                    return f"Type `{trigger}Hello everyone!` to post as {alias.name}"
-                else:
-                    return f"Type `{trigger} Hello everyone!` to post as {alias.name}"
-            
-            embed.add_field(
-                name="💡 How to Use", 
-                value=get_usage_example(alias.trigger), 
-                inline=False
-            )
-            
-            if avatar_url != "https://cdn.discordapp.com/embed/avatars/0.png":
-                embed.set_thumbnail(url=avatar_url)
-            
-            embed.set_footer(text="Use '/alias edit' to modify your character anytime!")
+            fields.append({"name": "💡 How to Use", "value": _usage_example(alias.trigger, alias.name), "inline": False})
             
             # If no avatar was provided, offer upload option
-            if not self.character_data.get('avatar_url'):
-                from bot.alias_commands import AliasUploadView
-                view = AliasUploadView(self.alias_manager, alias.name, interaction.client)
-                embed.add_field(name="💡 Add Avatar", value="Upload a custom avatar using the button below!", inline=False)
+            view = None
+            if not draft.avatar_url:
+                view = _get_upload_view()(self.alias_manager, alias.name, interaction.client)
+                fields.append({"name": "💡 Add Avatar", "value": "Upload a custom avatar using the button below!", "inline": False})
+            
+            # Build the embed in one go rather than through per-field add_field calls
+            payload = {
+                "title": f"✅ Character Created: {alias.name}",
+                "color": discord.Color.green().value,
+                "description": "Your character has been successfully registered!",
+                "fields": fields,
+                "footer": {"text": "Use '/alias edit' to modify your character anytime!"},
+            }
+            if avatar_url != DEFAULT_AVATAR_URL:
+                payload["thumbnail"] = {"url": avatar_url}
+            embed = discord.Embed.from_dict(payload)
+            
+            if view is not None:
                 await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             else:
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             
-        except Exception as e:
-            logger.error(f"Error completing character creation: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred while creating your character. Please try again.", 
-                ephemeral=True
-            )
+        except Exception:
+            logger.exception("Error completing character creation")
+            await _safe_error(interaction, "❌ An error occurred while creating your character. Please try again.")
 
 # Edit Modal Classes for /alias edit command
 
@@ -533,37 +602,39 @@ class CharacterEditBasicModal(ui.Modal, title='Edit Character - Basic Info'):
         """Store basic info and continue to appearance editing"""
         try:
             # Update character data
-            self.character_data.update({
-                'name': str(self.character_name.value),
-                'trigger': str(self.trigger_pattern.value),
-                'class_level': str(self.character_class.value).strip() if self.character_class.value else None,
-                'race': str(self.race.value).strip() if self.race.value else None,
-                'group_name': str(self.group_name.value).strip() if self.group_name.value else None
+            character_data = self.character_data
+            character_data.update({
+                'name': self.character_name.value,
+                'trigger': self.trigger_pattern.value,
+                'class_level': self.character_class.value.strip() if self.character_class.value else None,
+                'race': self.race.value.strip() if self.race.value else None,
+                'group_name': self.group_name.value.strip() if self.group_name.value else None
             })
             
             # Import view classes
             from bot.edit_modals import ContinueToEditAppearanceView
-            view = ContinueToEditAppearanceView(self.alias_manager, self.character_data)
+            view = ContinueToEditAppearanceView(self.alias_manager, character_data)
             
             embed = discord.Embed(
                 title="✅ Basic Info Updated",
                 color=discord.Color.blue(),
-                description=f"Character **{self.character_data['name']}** basic info updated!"
+                description=f"Character **{character_data['name']}** basic info updated!"
             )
             embed.add_field(name="Next Step", value="Click the button below to continue editing appearance details.", inline=False)
-            embed.add_field(name="Character Name", value=self.character_data['name'], inline=True)
-            embed.add_field(name="Trigger", value=f"`{self.character_data['trigger']}`", inline=True)
-            if self.character_data.get('class_level'):
-                embed.add_field(name="Class", value=self.character_data['class_level'], inline=True)
-            if self.character_data.get('race'):
-                embed.add_field(name="Race", value=self.character_data['race'], inline=True)
-            if self.character_data.get('group_name'):
-                embed.add_field(name="Group", value=self.character_data['group_name'], inline=True)
+            embed.add_field(name="Character Name", value=character_data['name'], inline=True)
+            embed.add_field(name="Trigger", value=f"`{character_data['trigger']}`", inline=True)
+            class_level = character_data['class_level']
+            race = character_data['race']
+            group_name = character_data['group_name']
+            if class_level:
+                embed.add_field(name="Class", value=class_level, inline=True)
+            if race:
+                embed.add_field(name="Race", value=race, inline=True)
+            if group_name:
+                embed.add_field(name="Group", value=group_name, inline=True)
             
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             
-        except Exception as e:
-            logger.error(f"Error in edit basic character modal: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred. Please try again.", ephemeral=True
-            )
\ No newline at end of file
+        except Exception:
+            logger.exception("Error in edit basic character modal")
+            await _safe_error(interaction, "❌ An error occurred. Please try again.")
\ No newline at end of file
@@ -1,11 +1,122 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from bot.views import SessionControlView, SessionInfoView
-from bot.session_setup_view import SessionTypeSelectionView
-from typing import Optional
+from bot.views import (
+    SessionControlView, SessionInfoView, RewardManagementView,
+    _generate_rewards_table, _generate_participant_table, get_display_names_from_db,
+    update_participant_table, update_session_capacity_tags, update_all_participant_tables,
+    schedule_forum_lock, get_rp_sessions_channel,
+)
+from bot.session_setup_view import SessionTypeSelectionView, SessionSetupView
+from typing import Dict, List, Optional
+from itertools import islice
+import asyncio
+import logging
+import os
 import re
-from datetime import datetime
+import string
+import uuid
+from datetime import datetime, timedelta
+from time import time as _time_now, monotonic
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Session IDs are limited to ASCII letters, digits, hyphens and underscores
+_SID_ALLOWED = frozenset(string.ascii_letters + string.digits + "_-")
+_SESSION_ID_CLEAN_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+# In-flight rp_debug_update refresh shared by concurrent callers
+_update_all_inflight = None
+
+# Participant count above which reward calculation moves to a worker thread
+_REWARDS_OFFLOAD_THRESHOLD = 20
+
+# Shared read-only fallback for participants without character info
+_EMPTY_CHAR = {}
+
+# Documentation file posted by bot_docs and its cached (mtime_ns, content)
+_DOC_PATH = 'DISCORD_BOT_COMMANDS.md'
+_DOC_THREAD_PREFIX = "🤖 Bot Commands Reference"
+_doc_cache = None
+
+def _read_documentation() -> str:
+    """Read the documentation file from disk"""
+    with open(_DOC_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+async def _load_documentation() -> str:
+    """Read the documentation file off the event loop, reusing the cached copy until it changes"""
+    global _doc_cache
+    mtime_ns = (await asyncio.to_thread(os.stat, _DOC_PATH)).st_mtime_ns
+    if _doc_cache is not None and _doc_cache[0] == mtime_ns:
+        return _doc_cache[1]
+    
+    content = await asyncio.to_thread(_read_documentation)
+    _doc_cache = (mtime_ns, content)
+    return content
+
+# Markdown prefixes _format_line_for_discord rewrites; anything else is posted unchanged
+_MD_PREFIX_RE = re.compile(r"(?P<cmd>### `/.*?` - )|(?P<h2>## )|(?P<h1># )|(?P<h4>#### )|\s*(?P<bullet>- )(?=.*\S)")
+
+# Forum channel ID -> ID of its "Completed" tag
+_completed_tag_cache = {}
+
+# Display names resolved for rp_info, keyed by (guild_id, user_id) -> (display_name, expires_at)
+_DISPLAY_NAME_TTL = 300
+_DISPLAY_NAME_CACHE_MAX = 10000
+_display_name_cache = OrderedDict()
+
+async def _cached_display_names(user_ids, guild: discord.Guild) -> Dict[int, str]:
+    """Resolve display names from the database or guild, reusing recent results"""
+    now = monotonic()
+    names = {}
+    misses = []
+    for user_id in user_ids:
+        cached = _display_name_cache.get((guild.id, user_id))
+        if cached is not None and cached[1] > now:
+            names[user_id] = cached[0]
+        else:
+            misses.append(user_id)
+    
+    if misses:
+        # One query for every uncached user, then fall back to the Discord API
+        db_names = get_display_names_from_db(misses, str(guild.id))
+        
+        # Members missing from both the database and the member cache are fetched in one gateway request
+        fetched = {}
+        unresolved = [uid for uid in misses if uid not in db_names and guild.get_member(uid) is None]
+        if unresolved:
+            try:
+                # Bounded so rp_info still answers inside the interaction window
+                members = await asyncio.wait_for(
+                    guild.query_members(user_ids=unresolved[:100], limit=100, cache=True),
+                    timeout=2
+                )
+                fetched = {member.id: member.display_name for member in members}
+            except (discord.ClientException, discord.HTTPException, asyncio.TimeoutError) as e:
+                logger.debug("Could not query members for display names: %s", e)
+        
+        expires_at = now + _DISPLAY_NAME_TTL
+        for user_id in misses:
+            display_name = db_names.get(user_id) or fetched.get(user_id)
+            if not display_name:
+                member = guild.get_member(user_id)
+                display_name = member.display_name if member else None
+            if not display_name:
+                # Not cached, so a transient gateway failure doesn't blank the name for the whole TTL
+                names[user_id] = "Unknown"
+                continue
+            names[user_id] = display_name
+            
+            key = (guild.id, user_id)
+            _display_name_cache[key] = (display_name, expires_at)
+            _display_name_cache.move_to_end(key)
+        
+        while len(_display_name_cache) > _DISPLAY_NAME_CACHE_MAX:
+            _display_name_cache.popitem(last=False)
+    
+    return names
 
 class RPCommands(commands.Cog):
     """Roleplay session management commands"""
@@ -21,7 +132,12 @@ class RPCommands(commands.Cog):
 
     def validate_session_id(self, session_id: str) -> bool:
         """Validate session ID format (alphanumeric, hyphens, underscores only)"""
-        return bool(re.match(r'^[a-zA-Z0-9_-]+$', session_id)) and 1 <= len(session_id) <= 50
+        return 1 <= len(session_id) <= 50 and _SID_ALLOWED.issuperset(session_id)
+    
+    @staticmethod
+    def _can_manage_channels(user) -> bool:
+        """Whether a user is a guild member with the Manage Channels permission"""
+        return isinstance(user, discord.Member) and user.guild_permissions.manage_channels
     
     def _get_session_from_thread(self, interaction: discord.Interaction):
         """Helper function to get session from current thread context"""
@@ -30,27 +146,19 @@ class RPCommands(commands.Cog):
             return None, None, "❌ This command can only be used in session threads."
         
         # Find the session running in this thread
-        session = None
-        session_id = None
-        
-        if interaction.guild_id in self.session_manager.sessions:
-            for sid, sess in self.session_manager.sessions[interaction.guild_id].items():
-                if sess.thread_id == interaction.channel.id:
-                    session = sess
-                    session_id = sid
-                    break
+        session = self.session_manager.get_session_by_thread(interaction.guild_id, interaction.channel.id)
         
         if not session:
             return None, None, "❌ No active session found in this thread."
         
         # Return the session, session_id, and no error
-        return session, session_id, None
+        return session, session.session_id, None
 
     @app_commands.command(name="rp_new", description="Start a new roleplay session")
     async def rp_new(self, interaction: discord.Interaction):
         """Start a new roleplay session"""
         try:
-            print(f"DEBUG: rp_new called by {interaction.user.display_name}")
+            logger.debug("rp_new called by %s", interaction.user.display_name)
             
             # Defer response to prevent timeout (we have 15 minutes after deferring)
             await interaction.response.defer(ephemeral=True)
@@ -63,7 +171,7 @@ class RPCommands(commands.Cog):
                 )
                 return
         except Exception as e:
-            print(f"DEBUG: Error in rp_new: {e}")
+            logger.error("Error in rp_new: %s", e)
             if not interaction.response.is_done():
                 await interaction.response.send_message(
                     f"❌ An error occurred: {str(e)}",
@@ -78,21 +186,19 @@ class RPCommands(commands.Cog):
         
         try:
             # Generate unique session ID based on user and timestamp
-            import time
-            timestamp = int(time.time() % 10000)  # Last 4 digits of timestamp
+            timestamp = int(_time_now()) % 10000  # Last 4 digits of timestamp
             session_id = f"{interaction.user.display_name.lower().replace(' ', '-')}-{timestamp}"
             
             # Ensure session ID is valid and unique
-            session_id = re.sub(r'[^a-zA-Z0-9_-]', '', session_id)[:46]  # Clean and limit length
-            counter = 1
-            original_id = session_id
-            while self.session_manager.get_session(interaction.guild_id, session_id):
-                session_id = f"{original_id}-{counter}"
-                counter += 1
-                if len(session_id) > 50:  # Fallback if name is too long
-                    session_id = f"session-{timestamp}-{counter}"
+            if not _SID_ALLOWED.issuperset(session_id):
+                session_id = _SESSION_ID_CLEAN_RE.sub('', session_id)  # Strip disallowed characters
+            session_id = session_id[:46]  # Limit length
+            base_session_id = session_id
+            while not self.session_manager.try_reserve_session_id(interaction.guild_id, session_id):
+                # Taken: retry with a random suffix until an unused ID is reserved
+                session_id = f"{base_session_id[:37]}-{uuid.uuid4().hex[:8]}"
             
-            print(f"DEBUG: Generated session ID: {session_id}")
+            logger.debug("Generated session ID: %s", session_id)
             
             # Show session type selection buttons
             embed = discord.Embed(
@@ -106,16 +212,12 @@ class RPCommands(commands.Cog):
             embed.add_field(name="🎲 Other", value="Custom session type", inline=True)
             embed.set_footer(text=f"Session ID: {session_id}")
             
-            print(f"DEBUG: Creating SessionTypeSelectionView...")
             view = SessionTypeSelectionView(self.session_manager, self.reward_calculator, session_id)
-            print(f"DEBUG: Sending followup...")
             await interaction.followup.send(embed=embed, view=view, ephemeral=True)
-            print(f"DEBUG: Followup sent successfully")
+            logger.debug("rp_new session type selection sent for %s", session_id)
             
         except Exception as e:
-            print(f"DEBUG: Error in rp_new main logic: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in rp_new main logic")
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -128,7 +230,7 @@ class RPCommands(commands.Cog):
                         ephemeral=True
                     )
             except Exception as followup_error:
-                print(f"DEBUG: Failed to send error message: {followup_error}")
+                logger.error("Failed to send error message: %s", followup_error)
 
     @app_commands.command(name="rp_end", description="End the active roleplay session in this thread")
     async def rp_end(self, interaction: discord.Interaction):
@@ -139,6 +241,10 @@ class RPCommands(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
         
+        user = interaction.user
+        guild = interaction.guild
+        guild_id = interaction.guild_id
+        
         # session is guaranteed to exist at this point due to helper function check
         if not session.is_active:
             await interaction.response.send_message(
@@ -149,167 +255,149 @@ class RPCommands(commands.Cog):
         
         # Check permissions (DM or admin) 
         # session is guaranteed to exist at this point due to helper function check
-        has_manage_channels = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.manage_channels
-        if interaction.user.id != session.dm_id and not has_manage_channels:
+        if user.id != session.dm_id and not self._can_manage_channels(user):
             await interaction.response.send_message(
                 "❌ Only the DM or server administrators can end this session.",
                 ephemeral=True
             )
             return
         
-        # End the session
-        ended_session = self.session_manager.end_session(interaction.guild_id, session_id)
+        # End the session in memory first so a failure can still be answered ephemerally
+        ended_session = self.session_manager.end_session(guild_id, session_id)
+        if not ended_session:
+            await interaction.response.send_message("❌ Failed to end the session.", ephemeral=True)
+            return
+        
+        # Forum tags, rewards and stats are slow; defer so they can't expire the interaction
+        await interaction.response.defer()
+        
+        # Resolve the session thread once for both the forum tag update and the rewards post
+        session_thread = None
+        if ended_session and ended_session.thread_id and guild:
+            session_thread = guild.get_thread(ended_session.thread_id)
         
         # Update forum post tags if it's a forum thread
-        if ended_session and ended_session.thread_id and interaction.guild:
-            await self._update_forum_tags_on_session_end(interaction.guild, ended_session)
+        if session_thread:
+            await self._update_forum_tags_on_session_end(guild, session_thread)
         
-        if ended_session:
-            # Calculate rewards
-            rewards = self.reward_calculator.calculate_session_rewards(ended_session)
-            
-            # Create session summary
-            embed = discord.Embed(
-                title="🛑 Roleplay Session Ended",
-                description=f"Session **{session_id}** has concluded!",
-                color=0xff0000
-            )
-            
-            session_duration = ended_session.get_session_duration()
-            duration_str = self.reward_calculator.format_time_duration(session_duration)
-            
-            embed.add_field(name="Duration", value=duration_str, inline=True)
-            # Count all participants, not just those with rewards
-            all_participants = set(ended_session.participants.keys()) | set(ended_session.participant_times.keys())
-            embed.add_field(name="Participants", value=str(len(all_participants)), inline=True)
-            embed.add_field(name="DM", value=f"<@{ended_session.dm_id}>", inline=True)
-            
-            # Post session end message in current channel
-            await interaction.response.send_message(embed=embed)
-            
-            # Always post rewards table (even if empty) in the SESSION THREAD using consistent format
-            from bot.views import _generate_rewards_table
-            
-            reward_embed = discord.Embed(
-                title="💰 Session Rewards",
-                color=0x00ff00 if rewards else 0x888888
-            )
-            
-            # Use same table format as rp-rewards channel for consistency
-            participant_table = await _generate_rewards_table(ended_session, self.reward_calculator, interaction.guild, rewards)
-            reward_embed.add_field(name="📊 Session Results", value=participant_table, inline=False)
-            
-            # Add session info
-            session_duration = ended_session.get_session_duration()
-            duration_str = self.reward_calculator.format_time_duration(session_duration)
-            
-            reward_embed.add_field(name="Session", value=session_id, inline=True)
-            reward_embed.add_field(name="Duration", value=duration_str, inline=True)
-            reward_embed.add_field(name="DM", value=f"<@{ended_session.dm_id}>", inline=True)
-            
-            # Import here to avoid circular imports
-            from bot.views import RewardManagementView
-            
-            # Create reward management view (always show, even for empty rewards)
-            reward_view = RewardManagementView(
-                rewards, ended_session, self.reward_calculator, session_id
-            )
-            
-            # Find the session thread and post rewards there
-            if ended_session.thread_id and interaction.guild:
-                session_thread = interaction.guild.get_thread(ended_session.thread_id)
-                if session_thread:
-                    try:
-                        await session_thread.send(embed=reward_embed, view=reward_view)
-                        print(f"DEBUG: Posted rewards to thread {session_thread.name}")
-                    except Exception as e:
-                        print(f"DEBUG: Failed to post to thread: {e}")
-                        # Fallback to current channel if thread post fails
-                        await interaction.followup.send(embed=reward_embed, view=reward_view)
-                else:
-                    print(f"DEBUG: Thread {ended_session.thread_id} not found")
-                    # Fallback to current channel if thread not found
-                    await interaction.followup.send(embed=reward_embed, view=reward_view)
-            else:
-                print(f"DEBUG: No thread_id or guild. thread_id={ended_session.thread_id}")
-                # Fallback to current channel if no thread
+        # Session length is fixed once ended; compute it once for every embed below
+        session_duration = ended_session.get_session_duration()
+        duration_str = self.reward_calculator.format_time_duration(session_duration)
+        duration_minutes = int(session_duration.total_seconds() // 60)
+        
+        # Calculate rewards
+        rewards = self.reward_calculator.calculate_session_rewards(ended_session)
+        
+        # Create session summary
+        embed = discord.Embed(
+            title="🛑 Roleplay Session Ended",
+            description=f"Session **{session_id}** has concluded!",
+            color=0xff0000
+        )
+        
+        embed.add_field(name="Duration", value=duration_str, inline=True)
+        # Count all participants, not just those with rewards
+        embed.add_field(name="Participants", value=str(ended_session.unique_participant_count), inline=True)
+        embed.add_field(name="DM", value=f"<@{ended_session.dm_id}>", inline=True)
+        
+        # Post session end message in current channel
+        await interaction.followup.send(embed=embed)
+        
+        # Always post rewards table (even if empty) in the SESSION THREAD using consistent format
+        reward_embed = discord.Embed(
+            title="💰 Session Rewards",
+            color=0x00ff00 if rewards else 0x888888
+        )
+        
+        # Use same table format as rp-rewards channel for consistency
+        participant_table = await _generate_rewards_table(ended_session, self.reward_calculator, guild, rewards)
+        reward_embed.add_field(name="📊 Session Results", value=participant_table, inline=False)
+        
+        # Add session info
+        reward_embed.add_field(name="Session", value=session_id, inline=True)
+        reward_embed.add_field(name="Duration", value=duration_str, inline=True)
+        reward_embed.add_field(name="DM", value=f"<@{ended_session.dm_id}>", inline=True)
+        
+        # Create reward management view (always show, even for empty rewards)
+        reward_view = RewardManagementView(
+            rewards, ended_session, self.reward_calculator, session_id
+        )
+        
+        # Post rewards in the session thread
+        if session_thread:
+            try:
+                await session_thread.send(embed=reward_embed, view=reward_view)
+                logger.debug("Posted rewards to thread %s", session_thread.name)
+            except Exception as e:
+                logger.warning("Failed to post rewards to thread: %s", e)
+                # Fallback to current channel if thread post fails
                 await interaction.followup.send(embed=reward_embed, view=reward_view)
+        else:
+            logger.debug("Session thread not found. thread_id=%s", ended_session.thread_id)
+            # Fallback to current channel if no thread
+            await interaction.followup.send(embed=reward_embed, view=reward_view)
+        
+        # Process achievements if achievement system is available
+        if self.achievement_system:
+            try:
+                # Prepare session data for achievement processing
+                session_data = {
+                    'guild_id': guild_id,
+                    'dm_id': ended_session.dm_id,
+                    'duration_minutes': duration_minutes,
+                    'session_id': session_id,
+                    'session_type': ended_session.session_type
+                }
+                
+                # Prepare participant data
+                participants_data = ended_session.bulk_participant_snapshot(rewards.keys())
+                for participant, (xp, gold) in zip(participants_data, rewards.values()):
+                    participant['final_xp'] = xp
+                    participant['final_gold'] = gold
+                
+                # Process achievements
+                await self.achievement_system.process_session_completion(session_data, participants_data)
+                
+            except Exception as e:
+                # Don't fail session end if achievement processing fails
+                logger.error("Achievement processing failed: %s", e)
             
-            # Process achievements if achievement system is available
-            if self.achievement_system:
+            # Update player statistics
+            if self.stats_system:
                 try:
-                    # Prepare session data for achievement processing
-                    session_data = {
-                        'guild_id': interaction.guild_id,
-                        'dm_id': ended_session.dm_id,
-                        'duration_minutes': int(session_duration.total_seconds() // 60),
-                        'session_id': session_id,
-                        'session_type': ended_session.session_type
-                    }
-                    
-                    # Prepare participant data
-                    participants_data = []
+                    stats_batch = []
                     for user_id, (xp, gold) in rewards.items():
-                        character_info = ended_session.participant_characters.get(user_id, {})
-                        participation_time = ended_session.get_participant_time(user_id)
+                        participation_time = session.get_participant_time(user_id)
+                        time_hours = participation_time.total_seconds() / 3600
                         
-                        participants_data.append({
-                            'user_id': user_id,
-                            'character_name': character_info.get('name', 'Unknown'),
-                            'character_level': character_info.get('level', 1),
-                            'participation_time_seconds': int(participation_time.total_seconds()),
-                            'final_xp': xp,
-                            'final_gold': gold
-                        })
-                    
-                    # Process achievements
-                    await self.achievement_system.process_session_completion(session_data, participants_data)
+                        character_info = session.participant_characters.get(user_id, _EMPTY_CHAR)
+                        character_level = character_info.get('level', 1)
+                        
+                        # Determine if session was completed (didn't leave early)
+                        left_early = user_id not in session.participants
+                        
+                        stats_batch.append((str(user_id), {
+                            'participated': True,
+                            'session_type': session.session_type,
+                            'time_spent_hours': time_hours,
+                            'was_dm': user_id == session.dm_id,
+                            'character_level': character_level,
+                            'xp_earned': xp,
+                            'gold_earned': gold,
+                            'completed_session': not left_early,
+                            'left_early': left_early,
+                            'session_date': session.end_time or datetime.now(),
+                            'new_character': False  # Could enhance this later
+                        }))
                     
-                except Exception as e:
-                    # Don't fail session end if achievement processing fails
-                    print(f"DEBUG: Achievement processing failed: {e}")
-                
-                # Update player statistics
-                if self.stats_system:
-                    try:
-                        for user_id, rewards in rewards.items():
-                            participation_time = session.get_participant_time(user_id)
-                            time_hours = participation_time.total_seconds() / 3600
-                            
-                            character_info = session.participant_characters.get(user_id, {})
-                            character_level = character_info.get('level', 1)
-                            
-                            # Determine if session was completed (didn't leave early)
-                            left_early = user_id not in session.participants
-                            
-                            stats_data = {
-                                'participated': True,
-                                'session_type': session.session_type,
-                                'time_spent_hours': time_hours,
-                                'was_dm': user_id == session.dm_id,
-                                'character_level': character_level,
-                                'xp_earned': rewards[0],  # rewards is tuple (xp, gold)
-                                'gold_earned': rewards[1],
-                                'completed_session': not left_early,
-                                'left_early': left_early,
-                                'session_date': session.end_time or datetime.now(),
-                                'new_character': False  # Could enhance this later
-                            }
-                            
-                            await self.stats_system.update_session_stats(
-                                str(user_id), 
-                                str(interaction.guild_id), 
-                                stats_data
-                            )
-                            
-                        print(f"DEBUG: Updated stats for {len(rewards)} participants")
+                    # One transaction for every participant instead of a round trip each
+                    await self.stats_system.update_session_stats_bulk(str(guild_id), stats_batch)
                         
-                    except Exception as e:
-                        # Don't fail session end if stats processing fails
-                        print(f"DEBUG: Stats processing failed: {e}")
+                    logger.debug("Updated stats for %d participants", len(stats_batch))
                     
-        else:
-            await interaction.response.send_message("❌ Failed to end the session.", ephemeral=True)
+                except Exception as e:
+                    # Don't fail session end if stats processing fails
+                    logger.error("Stats processing failed: %s", e)
 
     @app_commands.command(name="rp_join", description="Join the active roleplay session in this thread")
     @app_commands.describe(character_info="Character name and level (e.g., 'Gandalf 15')")
@@ -321,6 +409,11 @@ class RPCommands(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
         
+        user = interaction.user
+        uid = user.id
+        guild = interaction.guild
+        guild_id = interaction.guild_id
+        
         # session is guaranteed to exist at this point due to helper function check
         if not session.is_active:
             await interaction.response.send_message(
@@ -329,7 +422,7 @@ class RPCommands(commands.Cog):
             )
             return
         
-        if interaction.user.id in session.participants:
+        if uid in session.participants:
             await interaction.response.send_message(
                 f"❌ You are already in this session.",
                 ephemeral=True
@@ -338,25 +431,24 @@ class RPCommands(commands.Cog):
         
         # Store user's display name for later use
         display_name = "Unknown"
-        if isinstance(interaction.user, discord.Member):
-            if interaction.user.nick:
-                display_name = interaction.user.nick
-            elif hasattr(interaction.user, 'global_name') and interaction.user.global_name:
-                display_name = interaction.user.global_name
+        if isinstance(user, discord.Member):
+            if user.nick:
+                display_name = user.nick
+            elif hasattr(user, 'global_name') and user.global_name:
+                display_name = user.global_name
             else:
-                display_name = interaction.user.name
+                display_name = user.name
         else:
-            display_name = interaction.user.name
+            display_name = user.name
         
-        session.store_display_name(interaction.user.id, display_name)
-        print(f"DEBUG: Stored display name '{display_name}' for user {interaction.user.id} in join command")
+        session.store_display_name(uid, display_name)
+        logger.debug("Stored display name %r for user %s in join command", display_name, uid)
         
         # Parse character name and level
         input_text = character_info.strip()
-        parts = input_text.rsplit(' ', 1)
+        character_name, sep, level_str = input_text.rpartition(' ')
         
-        if len(parts) == 2:
-            character_name, level_str = parts
+        if sep:
             try:
                 character_level = int(level_str)
                 if character_level < 1 or character_level > 20:
@@ -386,26 +478,26 @@ class RPCommands(commands.Cog):
             )
             return
         
-        if session.add_participant(interaction.user.id, character_name, character_level):
+        # Join in memory first so a failure can still be answered ephemerally
+        if session.add_participant(uid, character_name, character_level):
             await interaction.response.send_message(
-                f"✅ {interaction.user.mention} joined the session as **{character_name}** (Level {character_level})!"
+                f"✅ {user.mention} joined the session as **{character_name}** (Level {character_level})!"
             )
             
             # Update message stats for session participation
             if self.stats_system:
                 try:
                     await self.stats_system.update_message_stats(
-                        str(interaction.user.id), 
-                        str(interaction.guild_id), 
+                        str(uid), 
+                        str(guild_id), 
                         1
                     )
                 except Exception as e:
-                    print(f"DEBUG: Failed to update message stats: {e}")
+                    logger.warning("Failed to update message stats: %s", e)
             # Update participant table and forum tags in real-time
-            if interaction.guild:
-                from bot.views import update_participant_table, update_session_capacity_tags
-                await update_participant_table(interaction.guild, session, self.reward_calculator)
-                await update_session_capacity_tags(interaction.guild, session)
+            if guild:
+                await update_participant_table(guild, session, self.reward_calculator)
+                await update_session_capacity_tags(guild, session)
         else:
             await interaction.response.send_message("❌ Failed to join the session.", ephemeral=True)
 
@@ -418,6 +510,10 @@ class RPCommands(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
         
+        user = interaction.user
+        uid = user.id
+        guild = interaction.guild
+        
         if not session.is_active:
             await interaction.response.send_message(
                 f"❌ The session in this thread is not active.",
@@ -425,27 +521,26 @@ class RPCommands(commands.Cog):
             )
             return
         
-        if interaction.user.id not in session.participants:
+        # Membership check and removal in one step
+        time_spent = session.try_remove_participant(uid)
+        if time_spent is None:
             await interaction.response.send_message(
                 f"❌ You are not in this session.",
                 ephemeral=True
             )
             return
         
-        if session.remove_participant(interaction.user.id):
-            time_spent = session.get_participant_time(interaction.user.id)
-            rounded_time = self.reward_calculator.round_to_nearest_30_minutes(time_spent)
-            time_str = self.reward_calculator.format_time_duration(rounded_time)
-            await interaction.response.send_message(
-                f"👋 {interaction.user.mention} left the session after {time_str}."
-            )
-            # Update participant table and forum tags in real-time
-            if interaction.guild:
-                from bot.views import update_participant_table, update_session_capacity_tags
-                await update_participant_table(interaction.guild, session, self.reward_calculator)
-                await update_session_capacity_tags(interaction.guild, session)
-        else:
-            await interaction.response.send_message("❌ Failed to leave the session.", ephemeral=True)
+        await interaction.response.defer()
+        
+        rounded_time = self.reward_calculator.round_to_nearest_30_minutes(time_spent)
+        time_str = self.reward_calculator.format_time_duration(rounded_time)
+        await interaction.followup.send(
+            f"👋 {user.mention} left the session after {time_str}."
+        )
+        # Update participant table and forum tags in real-time
+        if guild:
+            await update_participant_table(guild, session, self.reward_calculator)
+            await update_session_capacity_tags(guild, session)
 
     @app_commands.command(name="rp_pause", description="Pause the active roleplay session in this thread (DM only)")
     async def rp_pause(self, interaction: discord.Interaction):
@@ -516,7 +611,9 @@ class RPCommands(commands.Cog):
     @app_commands.command(name="rp_status", description="View information about active roleplay sessions")
     async def rp_status(self, interaction: discord.Interaction):
         """Display status of active roleplay sessions"""
-        active_sessions = self.session_manager.get_active_sessions(interaction.guild_id)
+        guild = interaction.guild
+        guild_id = interaction.guild_id
+        active_sessions = self.session_manager.get_active_sessions(guild_id)
         
         if not active_sessions:
             embed = discord.Embed(
@@ -533,6 +630,12 @@ class RPCommands(commands.Cog):
             color=0x0099ff
         )
         
+        # Look up every displayed participant's name in one query instead of one per user
+        db_names = {}
+        if guild:
+            shown_user_ids = {user_id for session in active_sessions for user_id in islice(session.participants, 5)}
+            db_names = get_display_names_from_db(shown_user_ids, str(guild_id))
+        
         for session in active_sessions:
             duration = session.get_session_duration()
             duration_str = self.reward_calculator.format_time_duration(duration)
@@ -542,33 +645,22 @@ class RPCommands(commands.Cog):
             
             # List participant names with character info using proper display names
             participant_mentions = []
-            for user_id in list(session.participants.keys())[:5]:  # Show up to 5 participants
+            for user_id in islice(session.participants, 5):  # Show up to 5 participants
                 # Get display name from database first, fallback to Discord API
-                display_name = "Unknown"
-                if interaction.guild:
-                    try:
-                        # Try database lookup first
-                        from bot.views import get_display_name_from_db
-                        db_name = get_display_name_from_db(user_id, str(interaction.guild.id))
-                        if db_name:
-                            display_name = db_name
-                        else:
-                            # Fallback to Discord API
-                            member = interaction.guild.get_member(user_id)
-                            if member:
-                                display_name = member.display_name
-                    except:
-                        pass
+                display_name = db_names.get(user_id)
+                if display_name is None:
+                    member = guild.get_member(user_id) if guild else None
+                    display_name = member.display_name if member else "Unknown"
                 
-                if user_id in session.participant_characters:
-                    char_data = session.participant_characters[user_id]
+                char_data = session.participant_characters.get(user_id)
+                if char_data is not None:
                     participant_mentions.append(f"{display_name} ({char_data['name']} Lvl{char_data['level']})")
                 else:
                     participant_mentions.append(display_name)
             
             participants_text = ", ".join(participant_mentions)
-            if len(session.participants) > 5:
-                participants_text += f" and {len(session.participants) - 5} more"
+            if participants_count > 5:
+                participants_text += f" and {participants_count - 5} more"
             
             if not participants_text:
                 participants_text = "None"
@@ -596,6 +688,8 @@ class RPCommands(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
         
+        guild = interaction.guild
+        
         if not session.is_active:
             await interaction.response.send_message(
                 f"❌ The session in this thread is not active.",
@@ -603,35 +697,33 @@ class RPCommands(commands.Cog):
             )
             return
         
-        has_manage_channels = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.manage_channels
-        if interaction.user.id != session.dm_id and not has_manage_channels:
+        if interaction.user.id != session.dm_id and not self._can_manage_channels(interaction.user):
             await interaction.response.send_message(
                 "❌ Only the DM or server administrators can remove players.",
                 ephemeral=True
             )
             return
         
-        if user.id not in session.participants:
+        # Membership check and removal in one step
+        time_spent = session.try_remove_participant(user.id)
+        if time_spent is None:
             await interaction.response.send_message(
                 f"❌ {user.mention} is not in this session.",
                 ephemeral=True
             )
             return
         
-        if session.remove_participant(user.id):
-            time_spent = session.get_participant_time(user.id)
-            rounded_time = self.reward_calculator.round_to_nearest_30_minutes(time_spent)
-            time_str = self.reward_calculator.format_time_duration(rounded_time)
-            await interaction.response.send_message(
-                f"🚪 {user.mention} was removed from the session after {time_str}."
-            )
-            # Update participant table and forum tags in real-time
-            if interaction.guild:
-                from bot.views import update_participant_table, update_session_capacity_tags
-                await update_participant_table(interaction.guild, session, self.reward_calculator)
-                await update_session_capacity_tags(interaction.guild, session)
-        else:
-            await interaction.response.send_message("❌ Failed to remove the player.", ephemeral=True)
+        await interaction.response.defer()
+        
+        rounded_time = self.reward_calculator.round_to_nearest_30_minutes(time_spent)
+        time_str = self.reward_calculator.format_time_duration(rounded_time)
+        await interaction.followup.send(
+            f"🚪 {user.mention} was removed from the session after {time_str}."
+        )
+        # Update participant table and forum tags in real-time
+        if guild:
+            await update_participant_table(guild, session, self.reward_calculator)
+            await update_session_capacity_tags(guild, session)
 
     @app_commands.command(name="rp_info", description="Get detailed information about the session in this thread")
     async def rp_info(self, interaction: discord.Interaction):
@@ -642,6 +734,9 @@ class RPCommands(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
         
+        # Name resolution may fall back to a gateway member query, so acknowledge within Discord's 3s window first
+        await interaction.response.defer()
+        
         # Create detailed embed
         embed = discord.Embed(
             title=f"📋 Session Info: {session_id}",
@@ -663,37 +758,35 @@ class RPCommands(commands.Cog):
         embed.add_field(name="Duration", value=duration_str, inline=True)
         
         # Participants
-        if session.participants or session.participant_times:
-            all_participants = set(session.participants.keys()) | set(session.participant_times.keys())
+        participants = session.participants
+        participant_times = session.participant_times
+        if participants or participant_times:
+            # Only build a union when both sides have entries; otherwise the keys view already is the set
+            if participants and participant_times:
+                all_participants = participants.keys() | participant_times.keys()
+            elif participants:
+                all_participants = participants.keys()
+            else:
+                all_participants = participant_times.keys()
             participant_info = []
+            # Show up to 10; only those need their names and times resolved
+            shown_participants = list(islice(all_participants, 10))
+            
+            # Resolve every shown participant's name up front with a single database query
+            display_names = await _cached_display_names(shown_participants, interaction.guild) if interaction.guild else {}
             
-            for user_id in all_participants:
+            for user_id in shown_participants:
                 time_spent = session.get_participant_time(user_id)
                 time_str = self.reward_calculator.format_time_duration(time_spent)
-                active_indicator = " (active)" if user_id in session.participants else ""
+                active_indicator = " (active)" if user_id in participants else ""
                 
-                # Get display name from database first, fallback to Discord API
-                display_name = "Unknown"
-                if interaction.guild:
-                    try:
-                        # Try database lookup first
-                        from bot.views import get_display_name_from_db
-                        db_name = get_display_name_from_db(user_id, str(interaction.guild.id))
-                        if db_name:
-                            display_name = db_name
-                        else:
-                            # Fallback to Discord API
-                            member = interaction.guild.get_member(user_id)
-                            if member:
-                                display_name = member.display_name
-                    except:
-                        pass
+                display_name = display_names.get(user_id, "Unknown")
                 
                 participant_info.append(f"{display_name}: {time_str}{active_indicator}")
             
-            participants_text = "\n".join(participant_info[:10])  # Show up to 10
             if len(all_participants) > 10:
-                participants_text += f"\n... and {len(all_participants) - 10} more"
+                participant_info.append(f"... and {len(all_participants) - 10} more")
+            participants_text = "\n".join(participant_info)
             
             embed.add_field(name="Participants", value=participants_text, inline=False)
         else:
@@ -701,7 +794,11 @@ class RPCommands(commands.Cog):
         
         # If session is ended, show final rewards
         if not session.is_active and session.end_time:
-            rewards = self.reward_calculator.calculate_session_rewards(session)
+            # Large sessions are calculated off the event loop; small ones aren't worth the thread hop
+            if len(session.participant_times) > _REWARDS_OFFLOAD_THRESHOLD:
+                rewards = await asyncio.to_thread(self.reward_calculator.calculate_session_rewards, session)
+            else:
+                rewards = self.reward_calculator.calculate_session_rewards(session)
             if rewards:
                 total_xp = sum(xp for xp, _ in rewards.values())
                 total_gold = sum(gold for _, gold in rewards.values())
@@ -711,34 +808,43 @@ class RPCommands(commands.Cog):
                     inline=True
                 )
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     
-    async def _update_forum_tags_on_session_end(self, guild: discord.Guild, session):
+    async def _update_forum_tags_on_session_end(self, guild: discord.Guild, thread: discord.Thread):
         """Update forum post tags when session ends - remove ALL tags except 'Completed'"""
         try:
             # Find the rp-sessions channel
-            rp_sessions_channel = discord.utils.get(guild.channels, name="rp-sessions")
+            rp_sessions_channel = get_rp_sessions_channel(guild)
             if not isinstance(rp_sessions_channel, discord.ForumChannel):
                 return
             
-            # Get the thread
-            thread = guild.get_thread(session.thread_id)
+            # Only session threads posted in the rp-sessions forum carry tags
             if not isinstance(thread, discord.Thread) or thread.parent != rp_sessions_channel:
                 return
             
-            # Find or create the "Completed" tag
+            # Find or create the "Completed" tag, reusing the tag ID resolved on a previous session end
             completed_tag = None
-            for tag in rp_sessions_channel.available_tags:
-                if tag.name.lower() == "completed":
-                    completed_tag = tag
-                    break
+            cached_tag_id = _completed_tag_cache.get(rp_sessions_channel.id)
+            if cached_tag_id is not None:
+                # get_tag is a dict lookup and returns None if the tag was deleted since
+                completed_tag = rp_sessions_channel.get_tag(cached_tag_id)
+                if completed_tag is None:
+                    _completed_tag_cache.pop(rp_sessions_channel.id, None)
+            if completed_tag is None:
+                available_tags = rp_sessions_channel.available_tags
+                completed_tag = next((tag for tag in available_tags if tag.name.casefold() == "completed"), None)
+                
+                # Create completed tag if it doesn't exist
+                if not completed_tag and len(available_tags) < 20:
+                    try:
+                        completed_tag = await rp_sessions_channel.create_tag(name="Completed")
+                    except discord.HTTPException:
+                        pass
             
-            # Create completed tag if it doesn't exist
-            if not completed_tag and len(rp_sessions_channel.available_tags) < 20:
-                try:
-                    completed_tag = await rp_sessions_channel.create_tag(name="Completed")
-                except discord.HTTPException:
-                    pass
+            if completed_tag:
+                _completed_tag_cache[rp_sessions_channel.id] = completed_tag.id
+            else:
+                _completed_tag_cache.pop(rp_sessions_channel.id, None)
             
             # Replace ALL tags with just the "Completed" tag
             new_tags = [completed_tag] if completed_tag else []
@@ -747,8 +853,6 @@ class RPCommands(commands.Cog):
             await thread.edit(applied_tags=new_tags)
             
             # Schedule the thread to be locked in 4 hours
-            import asyncio
-            from bot.views import schedule_forum_lock
             asyncio.create_task(schedule_forum_lock(thread))
             
         except Exception as e:
@@ -773,8 +877,7 @@ class RPCommands(commands.Cog):
             return
         
         # Check if user is DM or has admin permissions
-        has_manage_channels = isinstance(interaction.user, discord.Member) and interaction.user.guild_permissions.manage_channels
-        if interaction.user.id != session.dm_id and not has_manage_channels:
+        if interaction.user.id != session.dm_id and not self._can_manage_channels(interaction.user):
             await interaction.response.send_message(
                 "❌ Only the DM or server administrators can repost the session control panel.",
                 ephemeral=True
@@ -785,29 +888,29 @@ class RPCommands(commands.Cog):
             # We're already in the correct thread
             thread = interaction.channel
             
-            # Import the session setup view to create a new control panel
-            from bot.session_setup_view import SessionSetupView
-            from bot.views import _generate_participant_table
-            
-            # Generate the control panel embed
-            embed = discord.Embed(
-                title=f"🎲 D&D Session: {session_id}",
-                description=f"**DM:** <@{session.dm_id}>\n**Type:** {getattr(session, 'session_type', 'Unknown')}\n**Status:** {'⏸️ Paused' if session.is_paused else '▶️ Active'}",
-                color=0x00ff00 if session.is_active else 0x888888
-            )
-            
-            # Add session info
-            duration = session.get_session_duration()
-            duration_str = self.reward_calculator.format_time_duration(duration)
+            # Session info
+            session_type = getattr(session, 'session_type', 'Unknown')
+            max_players = getattr(session, 'max_players', 20)
+            active_players = len(session.participants)
+            duration_str = self.reward_calculator.format_time_duration(session.get_session_duration())
             status = "⏸️ Paused" if session.is_paused else ("▶️ Active" if session.is_active else "🛑 Completed")
-            embed.add_field(name="⏱️ Duration", value=duration_str, inline=True)
-            embed.add_field(name="👥 Active Players", value=f"{len(session.participants)}/{getattr(session, 'max_players', 20)}", inline=True)
-            embed.add_field(name="📊 Status", value=status, inline=True)
-            embed.add_field(name="🎯 Session ID", value=f"`{session_id}`", inline=True)
             
             # Add participant table
             participant_table = await _generate_participant_table(session, self.reward_calculator, interaction.guild)
-            embed.add_field(name=f"👥 Participants ({len(session.participants)})", value=participant_table, inline=False)
+            
+            # Generate the control panel embed in one shot
+            embed = discord.Embed.from_dict({
+                "title": f"🎲 D&D Session: {session_id}",
+                "description": f"**DM:** <@{session.dm_id}>\n**Type:** {session_type}\n**Status:** {'⏸️ Paused' if session.is_paused else '▶️ Active'}",
+                "color": 0x00ff00 if session.is_active else 0x888888,
+                "fields": [
+                    {"name": "⏱️ Duration", "value": duration_str, "inline": True},
+                    {"name": "👥 Active Players", "value": f"{active_players}/{max_players}", "inline": True},
+                    {"name": "📊 Status", "value": status, "inline": True},
+                    {"name": "🎯 Session ID", "value": f"`{session_id}`", "inline": True},
+                    {"name": f"👥 Participants ({active_players})", "value": participant_table, "inline": False}
+                ]
+            })
             
             # Create the control view
             view = SessionSetupView.create_session_control_view(session_id, session.dm_id)
@@ -835,9 +938,14 @@ class RPCommands(commands.Cog):
         
         await interaction.response.send_message("🔄 Forcing participant table updates...", ephemeral=True)
         
+        global _update_all_inflight
         try:
-            from bot.views import update_all_participant_tables
-            await update_all_participant_tables()
+            # Coalesce repeated requests onto the refresh that is already running
+            if _update_all_inflight is not None and not _update_all_inflight.done():
+                await interaction.followup.send("⏳ An update is already running; waiting for it to finish...", ephemeral=True)
+            else:
+                _update_all_inflight = asyncio.create_task(update_all_participant_tables())
+            await asyncio.shield(_update_all_inflight)
             await interaction.followup.send("✅ Update completed. Check console for debug output.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Update failed: {e}", ephemeral=True)
@@ -893,8 +1001,7 @@ class RPCommands(commands.Cog):
             
             # Load documentation content
             try:
-                with open('DISCORD_BOT_COMMANDS.md', 'r', encoding='utf-8') as f:
-                    doc_content = f.read()
+                doc_content = await _load_documentation()
             except FileNotFoundError:
                 await interaction.followup.send(
                     "❌ Documentation file not found. Please contact the bot developer.",
@@ -904,7 +1011,7 @@ class RPCommands(commands.Cog):
             
             if action == "post":
                 # Create new thread with documentation
-                thread_name = f"🤖 Bot Commands Reference - {discord.utils.utcnow().strftime('%Y-%m-%d')}"
+                thread_name = f"{_DOC_THREAD_PREFIX} - {discord.utils.utcnow().strftime('%Y-%m-%d')}"
                 
                 # Create initial embed
                 embed = discord.Embed(
@@ -948,40 +1055,24 @@ class RPCommands(commands.Cog):
                 )
                 
             elif action == "update":
-                # Find existing documentation thread
-                threads = []
+                # Find existing documentation thread (forum and text channels expose the same thread APIs)
+                latest_thread = await self._find_doc_thread(target_channel)
                 
-                # Handle forum channels vs regular text channels
-                if isinstance(target_channel, discord.ForumChannel):
-                    # For forum channels, check archived threads
-                    async for thread in target_channel.archived_threads(limit=50):
-                        if thread.name.startswith("🤖 Bot Commands Reference"):
-                            threads.append(thread)
-                    
-                    # Also check active threads in forum
-                    for thread in target_channel.threads:
-                        if thread.name.startswith("🤖 Bot Commands Reference"):
-                            threads.append(thread)
-                else:
-                    # For regular text channels
-                    async for thread in target_channel.archived_threads(limit=50):
-                        if thread.name.startswith("🤖 Bot Commands Reference"):
-                            threads.append(thread)
-                    
-                    # Also check active threads
-                    for thread in target_channel.threads:
-                        if thread.name.startswith("🤖 Bot Commands Reference"):
-                            threads.append(thread)
-                
-                if not threads:
+                if latest_thread is None:
                     await interaction.followup.send(
                         "❌ No existing documentation thread found. Use 'Post New Documentation' instead.",
                         ephemeral=True
                     )
                     return
                 
-                # Use the most recent thread
-                latest_thread = max(threads, key=lambda t: t.created_at)
+                # The starter message shares the thread's ID; reuse the cached copy when there is one
+                starter = latest_thread.starter_message
+                if starter is None:
+                    try:
+                        starter = await latest_thread.fetch_message(latest_thread.id)
+                    except discord.NotFound:
+                        # Threads started from a channel message keep their starter outside the thread
+                        pass
                 
                 # Clear old messages (keep the first embed message)
                 messages_to_delete = []
@@ -989,8 +1080,19 @@ class RPCommands(commands.Cog):
                     if message.author == self.bot.user and len(message.embeds) == 0:
                         messages_to_delete.append(message)
                 
-                # Delete in batches to avoid rate limits
-                for message in messages_to_delete:
+                # Bulk delete recent messages; Discord only bulk deletes messages younger than 14 days
+                bulk_cutoff = discord.utils.utcnow() - timedelta(days=14)
+                recent_messages = [m for m in messages_to_delete if m.created_at > bulk_cutoff]
+                old_messages = [m for m in messages_to_delete if m.created_at <= bulk_cutoff]
+                for i in range(0, len(recent_messages), 100):
+                    chunk = recent_messages[i:i + 100]
+                    try:
+                        await latest_thread.delete_messages(chunk)
+                    except discord.HTTPException:
+                        # Fall back to deleting this chunk one at a time
+                        old_messages.extend(chunk)
+                
+                for message in old_messages:
                     try:
                         await message.delete()
                     except discord.NotFound:
@@ -1000,13 +1102,13 @@ class RPCommands(commands.Cog):
                 await self._post_documentation_chunks(latest_thread, doc_content)
                 
                 # Update the main embed with timestamp
-                async for message in latest_thread.history(limit=1, oldest_first=True):
-                    if message.author == self.bot.user and message.embeds:
-                        embed = message.embeds[0]
-                        embed.timestamp = discord.utils.utcnow()
-                        embed.set_field_at(1, name="🔄 Last Updated", value=f"<t:{int(discord.utils.utcnow().timestamp())}:R>", inline=False)
-                        await message.edit(embed=embed)
-                        break
+                if starter is not None and starter.author == self.bot.user and starter.embeds:
+                    now = discord.utils.utcnow()
+                    embed = starter.embeds[0]
+                    embed.timestamp = now
+                    if len(embed.fields) > 1:
+                        embed.set_field_at(1, name="🔄 Last Updated", value=f"<t:{int(now.timestamp())}:R>", inline=False)
+                    await starter.edit(embed=embed)
                 
                 await interaction.followup.send(
                     f"✅ Documentation updated in thread: {latest_thread.mention}",
@@ -1014,69 +1116,85 @@ class RPCommands(commands.Cog):
                 )
                 
         except Exception as e:
-            print(f"Error in bot_docs command: {e}")
+            logger.error("Error in bot_docs command: %s", e)
             if interaction.response.is_done():
                 await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
             else:
                 await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
 
+    @staticmethod
+    async def _find_doc_thread(channel) -> Optional[discord.Thread]:
+        """Find the most recent documentation thread, checking active threads before archived ones"""
+        threads = [thread for thread in channel.threads if thread.name.startswith(_DOC_THREAD_PREFIX)]
+        
+        # Only page through the archive when no active thread matches
+        if not threads:
+            async for thread in channel.archived_threads(limit=50):
+                if thread.name.startswith(_DOC_THREAD_PREFIX):
+                    threads.append(thread)
+        
+        return max(threads, key=lambda t: t.created_at) if threads else None
+
     async def _post_documentation_chunks(self, thread: discord.Thread, content: str):
         """Split and post documentation content in chunks with proper Discord formatting"""
-        lines = content.split('\n')
-        current_chunk = ""
-        
-        for line in lines:
+        # Chunks are sent one after another so the documentation reads in order
+        for chunk in self._build_documentation_chunks(content):
+            await thread.send(chunk)
+    
+    def _build_documentation_chunks(self, content: str) -> List[str]:
+        """Format documentation lines and group them into messages under Discord's length limit"""
+        format_line = self._format_line_for_discord
+        chunks = []
+        # Buffer lines and join once per chunk rather than growing a string line by line
+        buf = []
+        buf_len = 0
+        
+        for line in content.split('\n'):
             # Process line for better Discord formatting
-            processed_line = self._format_line_for_discord(line)
+            processed_line = format_line(line)
+            line_len = len(processed_line) + 1
             
             # Check if adding this line would exceed Discord's limit
-            if len(current_chunk) + len(processed_line) + 1 > 1900:  # Leave some buffer
-                if current_chunk.strip():
-                    await thread.send(current_chunk.strip())
-                current_chunk = processed_line + "\n"
+            if buf_len + line_len > 1900:  # Leave some buffer
+                chunk = "\n".join(buf).strip()
+                if chunk:
+                    chunks.append(chunk)
+                buf = [processed_line]
+                buf_len = line_len
             else:
-                current_chunk += processed_line + "\n"
-        
-        # Send the last chunk
-        if current_chunk.strip():
-            await thread.send(current_chunk.strip())
+                buf.append(processed_line)
+                buf_len += line_len
+        
+        # Keep the last chunk
+        chunk = "\n".join(buf).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
     
     def _format_line_for_discord(self, line: str) -> str:
         """Format a line for proper Discord display"""
-        # Handle headers with command names
-        if line.startswith("### `/") and "` - " in line:
-            # Split at the dash to avoid markdown formatting issues
-            parts = line.split("` - ", 1)
-            if len(parts) == 2:
-                command_part = parts[0] + "`"
-                description_part = parts[1]
-                return f"**{command_part}** - {description_part}"
+        match = _MD_PREFIX_RE.match(line)
+        if match is None:
+            # Code blocks, inline code and regular lines are kept as is
+            return line
+        
+        kind = match.lastgroup
+        
+        # Handle headers with command names, splitting at the dash to avoid markdown formatting issues
+        if kind == "cmd":
+            return f"**{line[:match.end() - 3]}** - {line[match.end():]}"
         
         # Handle section headers
-        elif line.startswith("## "):
+        if kind == "h2":
             return f"**{line[3:]}**\n" + "─" * min(len(line[3:]), 40)
         
-        # Handle main headers  
-        elif line.startswith("# "):
+        # Handle main headers
+        if kind == "h1":
             return f"**🎯 {line[2:]}**\n" + "═" * min(len(line[2:]) + 4, 40)
         
         # Handle subsection headers
-        elif line.startswith("#### "):
+        if kind == "h4":
             return f"**{line[5:]}**"
         
         # Handle bullet points
-        elif line.strip().startswith("- "):
-            return f"• {line.strip()[2:]}"
-        
-        # Handle code blocks - keep as is but ensure proper formatting
-        elif line.strip().startswith("```"):
-            return line
-        
-        # Handle inline code
-        elif "`" in line and not line.strip().startswith("```"):
-            # Replace backticks with Discord's inline code formatting
-            return line
-        
-        # Regular lines
-        else:
-            return line
+        return f"• {line.strip()[2:]}"
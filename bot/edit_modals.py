@@ -2,14 +2,63 @@
 Edit modal classes for comprehensive character editing
 """
 
+import asyncio
 import discord
 from discord import ui
 from typing import Dict, Any
 import logging
+from functools import lru_cache
 from bot.alias_manager import AliasManager
+from bot.alias_commands import AliasUploadView
+from bot.character_creation_modals import _safe_error
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=256)
+def _result_embed_payload(name: str, trigger: str, class_level, race, pronouns, age, alignment, dndbeyond_url) -> dict:
+    """Build the "Character Updated" embed payload for a set of character details"""
+    # Basic info
+    fields = [{"name": "🎯 Trigger", "value": f"`{trigger}`", "inline": True}]
+    if class_level:
+        fields.append({"name": "⚔️ Class", "value": class_level, "inline": True})
+    if race:
+        fields.append({"name": "🧬 Race", "value": race, "inline": True})
+    
+    # Additional details
+    if pronouns:
+        fields.append({"name": "🗣️ Pronouns", "value": pronouns, "inline": True})
+    if age:
+        fields.append({"name": "📅 Age", "value": age, "inline": True})
+    if alignment:
+        fields.append({"name": "⚖️ Alignment", "value": alignment, "inline": True})
+    
+    # D&D Beyond link
+    if dndbeyond_url:
+        fields.append({"name": "🌐 D&D Beyond", "value": f"[View Character Sheet]({dndbeyond_url})", "inline": False})
+    
+    return {
+        "title": f"✅ Character Updated: {name}",
+        "color": discord.Color.green().value,
+        "description": "Your character has been successfully updated with all details!",
+        "fields": fields,
+        "footer": {"text": "Your character is ready for roleplay! Right-click character messages to view the full profile."}
+    }
+
+def _build_result_embed(updated_alias, character_data: Dict[str, Any]) -> discord.Embed:
+    """Build the "Character Updated" embed, reusing the payload when the same details are resubmitted"""
+    payload = _result_embed_payload(
+        updated_alias.name,
+        updated_alias.trigger,
+        character_data.get('class_level'),
+        character_data.get('race'),
+        character_data.get('pronouns'),
+        character_data.get('age'),
+        character_data.get('alignment'),
+        character_data.get('dndbeyond_url')
+    )
+    # Embeds keep the payload's containers, so give each one its own field list and footer
+    return discord.Embed.from_dict({**payload, "fields": list(payload["fields"]), "footer": dict(payload["footer"])})
+
 # View classes for edit flow
 class ContinueToEditAppearanceView(ui.View):
     def __init__(self, alias_manager: AliasManager, character_data: Dict[str, Any]):
@@ -51,10 +100,14 @@ class ContinueToEditBackstoryView(ui.View):
     async def save_changes(self, interaction: discord.Interaction, button: ui.Button):
         """Skip background editing and save current changes"""
         try:
+            # Acknowledge before the database write so the interaction can't time out
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            
             # Update the existing alias with current data (skipping background info)
             # Ensure avatar_url is never None
             avatar_url = self.character_data.get('avatar_url') or "https://cdn.discordapp.com/embed/avatars/0.png"
-            updated_alias = self.alias_manager.update_alias(
+            updated_alias = await asyncio.to_thread(
+                self.alias_manager.update_alias,
                 user_id=self.character_data['user_id'],
                 guild_id=self.character_data['guild_id'],
                 name=self.character_data['original_name'],  # Use original name to find alias
@@ -81,19 +134,16 @@ class ContinueToEditBackstoryView(ui.View):
             
             # If no custom avatar, show upload option
             if not self.character_data.get('avatar_url'):
-                from bot.alias_commands import AliasUploadView
                 view = AliasUploadView(self.alias_manager, updated_alias.name, interaction.client)
                 embed.add_field(name="💡 Add Avatar", value="Upload a custom avatar using the button below!", inline=False)
-                await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+                await interaction.followup.send(embed=embed, view=view, ephemeral=True)
             else:
                 embed.set_thumbnail(url=updated_alias.avatar_url)
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+                await interaction.followup.send(embed=embed, ephemeral=True)
             
         except Exception as e:
             logger.error(f"Error saving character edits: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred while updating your character. Please try again.", ephemeral=True
-            )
+            await _safe_error(interaction, "❌ An error occurred while updating your character. Please try again.")
 
 class CharacterEditAppearanceModal(ui.Modal, title='Edit Character - Appearance'):
     """Second edit modal: Character appearance"""
@@ -150,7 +200,7 @@ class CharacterEditAppearanceModal(ui.Modal, title='Edit Character - Appearance'
         """Store appearance info and proceed to backstory editing"""
         try:
             # Validate age if provided
-            age_value = str(self.age.value).strip() if self.age.value else None
+            age_value = self.age.value.strip() if self.age.value else None
             if age_value:
                 try:
                     age_num = int(age_value)
@@ -167,13 +217,16 @@ class CharacterEditAppearanceModal(ui.Modal, title='Edit Character - Appearance'
                     )
                     return
             
+            description = self.description.value.strip() if self.description.value else None
+            alignment = self.alignment.value.strip() if self.alignment.value else None
+            
             # Add appearance data
             self.character_data.update({
-                'avatar_url': str(self.avatar_url.value).strip() if self.avatar_url.value else None,
-                'description': str(self.description.value).strip() if self.description.value else None,
-                'pronouns': str(self.pronouns.value).strip() if self.pronouns.value else None,
+                'avatar_url': self.avatar_url.value.strip() if self.avatar_url.value else None,
+                'description': description,
+                'pronouns': self.pronouns.value.strip() if self.pronouns.value else None,
                 'age': age_value,
-                'alignment': str(self.alignment.value).strip() if self.alignment.value else None
+                'alignment': alignment
             })
             
             # Create a view with a button to continue to the final step
@@ -186,15 +239,12 @@ class CharacterEditAppearanceModal(ui.Modal, title='Edit Character - Appearance'
             )
             embed.add_field(name="Final Step", value="Click the button below to edit backstory and save changes.", inline=False)
             
-            if self.character_data.get('description'):
-                embed.add_field(name="Description", value=self.character_data['description'][:100] + "..." if len(self.character_data['description']) > 100 else self.character_data['description'], inline=False)
+            if description:
+                description_preview = description if len(description) <= 100 else description[:100] + "..."
+                embed.add_field(name="Description", value=description_preview, inline=False)
             
             # Show additional character details
-            details = []
-            if self.character_data.get('age'):
-                details.append(f"Age: {self.character_data['age']}")
-            if self.character_data.get('alignment'):
-                details.append(f"Alignment: {self.character_data['alignment']}")
+            details = [f"{label}: {value}" for label, value in (("Age", age_value), ("Alignment", alignment)) if value]
             if details:
                 embed.add_field(name="Character Details", value=" • ".join(details), inline=False)
             
@@ -263,17 +313,21 @@ class CharacterEditBackstoryModal(ui.Modal, title='Edit Character - Background')
     async def on_submit(self, interaction: discord.Interaction):
         """Complete character editing with all collected data"""
         try:
+            # Acknowledge before the database write so the interaction can't time out
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            
             # Add final data
             self.character_data.update({
-                'backstory': str(self.backstory.value).strip() if self.backstory.value else None,
-                'goals': str(self.goals.value).strip() if self.goals.value else None,
-                'notes': str(self.notes.value).strip() if self.notes.value else None,
-                'dndbeyond_url': str(self.dndbeyond_url.value).strip() if self.dndbeyond_url.value else None,
-                'personality': str(self.personality.value).strip() if self.personality.value else None
+                'backstory': self.backstory.value.strip() if self.backstory.value else None,
+                'goals': self.goals.value.strip() if self.goals.value else None,
+                'notes': self.notes.value.strip() if self.notes.value else None,
+                'dndbeyond_url': self.dndbeyond_url.value.strip() if self.dndbeyond_url.value else None,
+                'personality': self.personality.value.strip() if self.personality.value else None
             })
             
-            # Update the existing alias
-            updated_alias = self.alias_manager.update_alias(
+            # Update the existing alias on a worker thread so the database round trip doesn't block the event loop
+            updated_alias = await asyncio.to_thread(
+                self.alias_manager.update_alias,
                 user_id=self.character_data['user_id'],
                 guild_id=self.character_data['guild_id'],
                 name=self.character_data['original_name'],  # Use original name to find alias
@@ -295,36 +349,7 @@ class CharacterEditBackstoryModal(ui.Modal, title='Edit Character - Background')
             )
             
             # Create comprehensive preview embed
-            embed = discord.Embed(
-                title=f"✅ Character Updated: {updated_alias.name}",
-                color=discord.Color.green(),
-                description="Your character has been successfully updated with all details!"
-            )
-            
-            # Basic info
-            embed.add_field(name="🎯 Trigger", value=f"`{updated_alias.trigger}`", inline=True)
-            if self.character_data.get('class_level'):
-                embed.add_field(name="⚔️ Class", value=self.character_data['class_level'], inline=True)
-            if self.character_data.get('race'):
-                embed.add_field(name="🧬 Race", value=self.character_data['race'], inline=True)
-            
-            # Additional details
-            if self.character_data.get('pronouns'):
-                embed.add_field(name="🗣️ Pronouns", value=self.character_data['pronouns'], inline=True)
-            if self.character_data.get('age'):
-                embed.add_field(name="📅 Age", value=self.character_data['age'], inline=True)
-            if self.character_data.get('alignment'):
-                embed.add_field(name="⚖️ Alignment", value=self.character_data['alignment'], inline=True)
-            
-            # D&D Beyond link
-            if self.character_data.get('dndbeyond_url'):
-                embed.add_field(
-                    name="🌐 D&D Beyond", 
-                    value=f"[View Character Sheet]({self.character_data['dndbeyond_url']})", 
-                    inline=False
-                )
-            
-            embed.set_footer(text="Your character is ready for roleplay! Right-click character messages to view the full profile.")
+            embed = _build_result_embed(updated_alias, self.character_data)
             
             # Check if we already have a custom avatar or just default
             has_custom_avatar = (self.character_data.get('avatar_url') and 
@@ -332,20 +357,17 @@ class CharacterEditBackstoryModal(ui.Modal, title='Edit Character - Background')
             
             # If no custom avatar was provided, show upload option  
             if not has_custom_avatar:
-                from bot.alias_commands import AliasUploadView
                 view = AliasUploadView(self.alias_manager, updated_alias.name, interaction.client)
                 embed.add_field(name="💡 Add Avatar", value="Upload a custom avatar using the button below!", inline=False)
-                await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+                await interaction.followup.send(embed=embed, view=view, ephemeral=True)
                 return
             
             # Set avatar if available
             if updated_alias.avatar_url and updated_alias.avatar_url != "https://cdn.discordapp.com/embed/avatars/0.png":
                 embed.set_thumbnail(url=updated_alias.avatar_url)
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
             
         except Exception as e:
             logger.error(f"Error in edit backstory character modal: {e}")
-            await interaction.response.send_message(
-                "❌ An error occurred while updating your character. Please try again.", ephemeral=True
-            )
\ No newline at end of file
+            await _safe_error(interaction, "❌ An error occurred while updating your character. Please try again.")
\ No newline at end of file
@@ -6,19 +6,109 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import discord
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from database import get_db_session
 from models import Guild, GuildMember
 
 logger = logging.getLogger(__name__)
 
+# Shared compact encoder for role ID lists, built once instead of per json.dumps call
+_encode_roles = json.JSONEncoder(separators=(',', ':')).encode
+
+# Retry delays after a failed periodic sync, doubling from the minimum up to the maximum
+SYNC_RETRY_MIN_SECONDS = 60
+SYNC_RETRY_MAX_SECONDS = 1800
+
+# Member join/update events are written together once this many are queued or the window elapses
+MEMBER_WRITE_BATCH = 100
+MEMBER_WRITE_WINDOW = 0.25  # seconds
+
+# Rows bound per upsert execution, keeping each round trip's parameter list bounded
+UPSERT_BATCH_SIZE = 500
+
+def _member_row(guild: discord.Guild, member: discord.Member, sync_time: datetime, guild_id_str: Optional[str] = None) -> dict:
+    """Build the guild_members column values for a Discord member"""
+    guild_id = guild.id
+    avatar_url = None
+    if member.avatar:
+        avatar_url = str(member.avatar.url)
+    elif member.default_avatar:
+        avatar_url = str(member.default_avatar.url)
+    
+    # Get role IDs as JSON
+    role_ids = [str(role.id) for role in member.roles if role.id != guild_id]  # Exclude @everyone
+    
+    return {
+        'guild_id': guild_id_str or str(guild_id),
+        'user_id': str(member.id),
+        'username': member.name,
+        'display_name': member.display_name,
+        'discriminator': member.discriminator if hasattr(member, 'discriminator') else None,
+        'avatar_url': avatar_url,
+        'joined_at': member.joined_at,
+        'roles': _encode_roles(role_ids) if role_ids else None,
+        'cached_at': sync_time,
+        'updated_at': sync_time,
+        'is_active': True
+    }
+
+def _member_fingerprint(row: dict) -> int:
+    """Hash the member fields a sync writes, ignoring timestamps"""
+    return hash((row['username'], row['display_name'], row['discriminator'],
+                 row['avatar_url'], row['joined_at'], row['roles']))
+
+def _member_event_fingerprint(member: discord.Member) -> int:
+    """Hash the member attributes the cache stores; role order is ignored so position-only changes match"""
+    return hash((
+        member.name,
+        member.display_name,
+        member.avatar.key if member.avatar else None,
+        frozenset(role.id for role in member.roles)
+    ))
+
+def _build_member_upsert():
+    """Build the guild_members INSERT ... ON CONFLICT statement shared by every member write"""
+    stmt = pg_insert(GuildMember)
+    excluded = stmt.excluded
+    # cached_at keeps the time the member was first cached
+    return stmt.on_conflict_do_update(
+        index_elements=['guild_id', 'user_id'],
+        set_={
+            'username': excluded.username,
+            'display_name': excluded.display_name,
+            'discriminator': excluded.discriminator,
+            'avatar_url': excluded.avatar_url,
+            'joined_at': excluded.joined_at,
+            'roles': excluded.roles,
+            'updated_at': excluded.updated_at,
+            'is_active': True
+        }
+    )
+
+# Compiled once and reused; rows are bound as executemany parameters
+_MEMBER_UPSERT = _build_member_upsert()
+
+def _upsert_member_rows(db, rows: list):
+    """Insert or refresh guild_members rows, executing the shared upsert per batch"""
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        db.execute(_MEMBER_UPSERT, rows[start:start + UPSERT_BATCH_SIZE])
+
 class GuildMemberCache:
     def __init__(self, bot: discord.Client):
         self.bot = bot
         self.sync_interval_hours = 6  # Sync every 6 hours
         self.is_running = False
+        # guild_id -> {user_id: fingerprint} of the member data last written by a sync
+        self._member_fingerprints: Dict[int, Dict[str, int]] = {}
+        self._guild_sync_sem = asyncio.Semaphore(4)  # Guilds synced at once
+        # (guild_id, user_id) -> latest row from join/update events, waiting for the batched writer
+        self._pending_member_rows: Dict[Tuple[str, str], dict] = {}
+        self._pending_event = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
         
     async def start_periodic_sync(self):
         """Start the periodic member sync task"""
@@ -27,14 +117,27 @@ class GuildMemberCache:
             
         self.is_running = True
         logger.info("Starting guild member cache sync task")
+        self._writer_task = asyncio.create_task(self._member_write_loop())
         
+        self._stop_event.clear()
+        retry_delay = SYNC_RETRY_MIN_SECONDS
         while self.is_running:
             try:
                 await self.sync_all_guilds()
-                await asyncio.sleep(self.sync_interval_hours * 3600)  # Convert hours to seconds
+                delay = self.sync_interval_hours * 3600  # Convert hours to seconds
+                retry_delay = SYNC_RETRY_MIN_SECONDS
             except Exception as e:
                 logger.error(f"Error in periodic guild member sync: {e}")
-                await asyncio.sleep(300)  # Wait 5 minutes before retry on error
+                # Back off exponentially while syncs keep failing
+                delay = retry_delay
+                retry_delay = min(retry_delay * 2, SYNC_RETRY_MAX_SECONDS)
+            
+            # Sleep until the next sync, waking immediately if stop() is called
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                break
+            except asyncio.TimeoutError:
+                pass
     
     async def sync_all_guilds(self):
         """Sync member data for all guilds the bot is in"""
@@ -42,18 +145,27 @@ class GuildMemberCache:
             logger.warning("Bot not ready, skipping guild member sync")
             return
             
+        # Guilds sync concurrently, a few at a time, each with its own database session
+        guilds = self.bot.guilds
+        results = await asyncio.gather(
+            *(self._sync_guild_bounded(guild) for guild in guilds),
+            return_exceptions=True
+        )
+        
         guilds_synced = 0
-        for guild in self.bot.guilds:
-            try:
-                await self.sync_guild_members(guild)
+        for guild, result in zip(guilds, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to sync members for guild {guild.name} ({guild.id}): {result}")
+            else:
                 guilds_synced += 1
-                # Small delay between guilds to avoid rate limits
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.error(f"Failed to sync members for guild {guild.name} ({guild.id}): {e}")
         
         logger.info(f"Completed guild member sync for {guilds_synced} guilds")
     
+    async def _sync_guild_bounded(self, guild: discord.Guild):
+        """Sync a guild once a concurrent sync slot is free"""
+        async with self._guild_sync_sem:
+            await self.sync_guild_members(guild)
+    
     async def sync_guild_members(self, guild: discord.Guild):
         """Sync member data for a specific guild"""
         logger.debug(f"Syncing members for guild: {guild.name} ({guild.id})")
@@ -63,12 +175,15 @@ class GuildMemberCache:
             logger.error("Failed to get database session for member sync")
             return
             
+        # Stringify the guild ID once for the guild record and every member row
+        guild_id_str = str(guild.id)
+        
         try:
             # Ensure guild exists in database
-            guild_record = db.query(Guild).filter(Guild.id == str(guild.id)).first()
+            guild_record = db.query(Guild).filter(Guild.id == guild_id_str).first()
             if not guild_record:
                 guild_record = Guild(
-                    id=str(guild.id),
+                    id=guild_id_str,
                     name=guild.name,
                     created_at=datetime.utcnow()
                 )
@@ -83,31 +198,49 @@ class GuildMemberCache:
             sync_time = datetime.utcnow()
             guild_record.last_member_sync = sync_time
             
-            # Get current member IDs to track who's still in the guild
-            current_member_ids = set()
+            # Fingerprints from the previous sync; members whose data hasn't changed are not rewritten
+            previous = self._member_fingerprints.pop(guild.id, None)
+            fingerprints = {}
             
-            # Sync each member
+            # Collect changed members' rows, then write them with a few bulk upserts
+            rows = []
             members_processed = 0
-            async for member in guild.fetch_members(limit=None):
+            async for member in self._iter_members(guild):
                 try:
-                    await self.sync_guild_member(db, guild, member, sync_time)
-                    current_member_ids.add(str(member.id))
+                    row = _member_row(guild, member, sync_time, guild_id_str)
+                    user_id = row['user_id']
+                    fingerprint = _member_fingerprint(row)
+                    fingerprints[user_id] = fingerprint
                     members_processed += 1
+                    if previous is None or previous.get(user_id) != fingerprint:
+                        rows.append(row)
                 except Exception as e:
                     logger.warning(f"Failed to sync member {member.id} in guild {guild.id}: {e}")
             
+            _upsert_member_rows(db, rows)
+            
             # Mark members who left as inactive
-            db.query(GuildMember).filter(
-                GuildMember.guild_id == str(guild.id),
-                ~GuildMember.user_id.in_(current_member_ids),
+            inactive_query = db.query(GuildMember).filter(
+                GuildMember.guild_id == guild_id_str,
                 GuildMember.is_active == True
-            ).update({
-                'is_active': False,
-                'updated_at': sync_time
-            }, synchronize_session=False)
+            )
+            if previous is None:
+                # Every current member was just stamped with sync_time
+                inactive_query = inactive_query.filter(GuildMember.updated_at < sync_time)
+            else:
+                # Unchanged members weren't rewritten, so compare against the previous sync instead
+                departed_ids = list(previous.keys() - fingerprints.keys())
+                inactive_query = inactive_query.filter(GuildMember.user_id.in_(departed_ids)) if departed_ids else None
+            
+            if inactive_query is not None:
+                inactive_query.update({
+                    'is_active': False,
+                    'updated_at': sync_time
+                }, synchronize_session=False)
             
             db.commit()
-            logger.info(f"Synced {members_processed} members for guild {guild.name}")
+            self._member_fingerprints[guild.id] = fingerprints
+            logger.info(f"Synced {members_processed} members for guild {guild.name} ({len(rows)} changed)")
             
         except Exception as e:
             logger.error(f"Error syncing guild {guild.id}: {e}")
@@ -115,55 +248,67 @@ class GuildMemberCache:
         finally:
             db.close()
     
-    async def sync_guild_member(self, db, guild: discord.Guild, member: discord.Member, sync_time: datetime):
-        """Sync a specific guild member"""
-        # Check if member record exists
-        member_record = db.query(GuildMember).filter(
-            GuildMember.guild_id == str(guild.id),
-            GuildMember.user_id == str(member.id)
-        ).first()
-        
-        # Prepare member data
-        avatar_url = None
-        if member.avatar:
-            avatar_url = str(member.avatar.url)
-        elif member.default_avatar:
-            avatar_url = str(member.default_avatar.url)
-        
-        # Get role IDs as JSON
-        role_ids = [str(role.id) for role in member.roles if role.id != guild.id]  # Exclude @everyone
-        roles_json = json.dumps(role_ids) if role_ids else None
-        
-        if member_record:
-            # Update existing record
-            member_record.username = member.name
-            member_record.display_name = member.display_name
-            member_record.discriminator = member.discriminator if hasattr(member, 'discriminator') else None
-            member_record.avatar_url = avatar_url
-            member_record.joined_at = member.joined_at
-            member_record.roles = roles_json
-            member_record.updated_at = sync_time
-            member_record.is_active = True
+    async def _iter_members(self, guild: discord.Guild):
+        """Yield a guild's members, from the gateway cache when the members intent allows it"""
+        if self.bot.intents.members:
+            # One gateway chunk request fills the cache; no REST pagination needed afterwards
+            if not guild.chunked:
+                await guild.chunk(cache=True)
+            for member in guild.members:
+                yield member
         else:
-            # Create new record
-            member_record = GuildMember(
-                guild_id=str(guild.id),
-                user_id=str(member.id),
-                username=member.name,
-                display_name=member.display_name,
-                discriminator=member.discriminator if hasattr(member, 'discriminator') else None,
-                avatar_url=avatar_url,
-                joined_at=member.joined_at,
-                roles=roles_json,
-                cached_at=sync_time,
-                updated_at=sync_time,
-                is_active=True
-            )
-            db.add(member_record)
+            async for member in guild.fetch_members(limit=None):
+                yield member
+    
+    def queue_member_write(self, member: discord.Member):
+        """Queue a member's current data for the next batched write"""
+        row = _member_row(member.guild, member, datetime.utcnow())
+        self._pending_member_rows[(row['guild_id'], row['user_id'])] = row
+        # The next sync should rewrite this member regardless of its last fingerprint
+        self.forget_member(member.guild.id, member.id)
+        self._pending_event.set()
+    
+    def discard_member_write(self, guild_id: int, user_id: int):
+        """Drop a queued write so a departed member isn't reactivated"""
+        self._pending_member_rows.pop((str(guild_id), str(user_id)), None)
+    
+    async def _member_write_loop(self):
+        """Write queued member changes in batches"""
+        while self.is_running:
+            await self._pending_event.wait()
+            self._pending_event.clear()
+            
+            # Let a burst of events accumulate unless a full batch is already waiting
+            if len(self._pending_member_rows) < MEMBER_WRITE_BATCH:
+                await asyncio.sleep(MEMBER_WRITE_WINDOW)
+            
+            rows = list(self._pending_member_rows.values())
+            self._pending_member_rows = {}
+            if not rows:
+                continue
+            
+            try:
+                with get_db_session() as db:
+                    _upsert_member_rows(db, rows)
+                    db.commit()
+                logger.debug(f"Wrote {len(rows)} queued member updates")
+            except Exception as e:
+                logger.error(f"Error writing {len(rows)} queued member updates: {e}")
+    
+    def forget_member(self, guild_id: int, user_id: int):
+        """Clear a member's sync fingerprint so the next sync rewrites them"""
+        guild_fingerprints = self._member_fingerprints.get(guild_id)
+        if guild_fingerprints is not None:
+            # Keep the key so a member who leaves before the next sync is still detected as departed
+            guild_fingerprints[str(user_id)] = None
     
     def stop(self):
         """Stop the periodic sync task"""
         self.is_running = False
+        self._stop_event.set()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
         logger.info("Stopped guild member cache sync task")
 
 # Global instance
@@ -199,95 +344,53 @@ async def sync_guild_members_now(guild_id: Optional[str] = None):
         # Sync all guilds
         await _guild_member_cache.sync_all_guilds()
 
-async def handle_member_join(member: discord.Member):
-    """Handle when a member joins a guild"""
+async def _apply_member_change(op: str, member: discord.Member):
+    """Apply a member event to the cache ('upsert' or 'deactivate')"""
     if _guild_member_cache is None:
         logger.warning("Guild member cache not initialized")
         return
-        
-    try:
-        db = get_db_session()
-        if not db:
-            logger.error("Failed to get database session for member join")
-            return
-            
-        sync_time = datetime.utcnow()
-        await _guild_member_cache.sync_guild_member(db, member.guild, member, sync_time)
-        db.commit()
-        logger.info(f"Added new member {member.name} to cache for guild {member.guild.name}")
-        
-    except Exception as e:
-        logger.error(f"Error handling member join for {member.name}: {e}")
-        if db:
-            db.rollback()
-    finally:
-        if db:
-            db.close()
-
-async def handle_member_remove(member: discord.Member):
-    """Handle when a member leaves a guild"""
-    if _guild_member_cache is None:
-        logger.warning("Guild member cache not initialized")
-        return
-        
+    
     try:
-        db = get_db_session()
-        if not db:
-            logger.error("Failed to get database session for member remove")
+        if op == 'upsert':
+            # Joins and updates go through the batched writer
+            _guild_member_cache.queue_member_write(member)
+            logger.debug(f"Queued member {member.name} for cache in guild {member.guild.name}")
             return
-            
-        from models import GuildMember
         
-        # Mark member as inactive
-        member_record = db.query(GuildMember).filter(
-            GuildMember.guild_id == str(member.guild.id),
-            GuildMember.user_id == str(member.id)
-        ).first()
+        _guild_member_cache.forget_member(member.guild.id, member.id)
+        _guild_member_cache.discard_member_write(member.guild.id, member.id)
         
-        if member_record:
-            member_record.is_active = False
-            member_record.updated_at = datetime.utcnow()
+        # The session context returns the connection to the pool and rolls back anything uncommitted
+        with get_db_session() as db:
+            # Mark member as inactive in a single UPDATE rather than loading the row first
+            updated = db.query(GuildMember).filter(
+                GuildMember.guild_id == str(member.guild.id),
+                GuildMember.user_id == str(member.id)
+            ).update({
+                'is_active': False,
+                'updated_at': datetime.utcnow()
+            }, synchronize_session=False)
             db.commit()
+        
+        if updated:
             logger.info(f"Marked member {member.name} as inactive in cache for guild {member.guild.name}")
         else:
             logger.warning(f"Member {member.name} not found in cache for guild {member.guild.name}")
             
     except Exception as e:
-        logger.error(f"Error handling member remove for {member.name}: {e}")
-        if db:
-            db.rollback()
-    finally:
-        if db:
-            db.close()
+        logger.error(f"Error applying member {op} for {member.name}: {e}")
+
+async def handle_member_join(member: discord.Member):
+    """Handle when a member joins a guild"""
+    await _apply_member_change('upsert', member)
+
+async def handle_member_remove(member: discord.Member):
+    """Handle when a member leaves a guild"""
+    await _apply_member_change('deactivate', member)
 
 async def handle_member_update(before: discord.Member, after: discord.Member):
     """Handle when a member's information is updated"""
-    if _guild_member_cache is None:
-        logger.warning("Guild member cache not initialized")
-        return
-        
     # Check if relevant information changed
-    if (before.name == after.name and 
-        before.display_name == after.display_name and
-        before.avatar == after.avatar and
-        before.roles == after.roles):
+    if _member_event_fingerprint(before) == _member_event_fingerprint(after):
         return  # No relevant changes
-        
-    try:
-        db = get_db_session()
-        if not db:
-            logger.error("Failed to get database session for member update")
-            return
-            
-        sync_time = datetime.utcnow()
-        await _guild_member_cache.sync_guild_member(db, after.guild, after, sync_time)
-        db.commit()
-        logger.debug(f"Updated member {after.name} in cache for guild {after.guild.name}")
-        
-    except Exception as e:
-        logger.error(f"Error handling member update for {after.name}: {e}")
-        if db:
-            db.rollback()
-    finally:
-        if db:
-            db.close()
\ No newline at end of file
+    await _apply_member_change('upsert', after)
@@ -1,9 +1,27 @@
+import asyncio
 import discord
-from typing import Optional, cast
+import logging
+from typing import Dict, List, Optional, Tuple, cast
+
+logger = logging.getLogger(__name__)
 
 class SessionSetupModal(discord.ui.Modal):
     """Modal for collecting session setup information"""
     
+    # Emoji shown for each session type
+    _SESSION_TYPE_EMOJIS = {
+        "Combat": "⚔️",
+        "Social": "💬",
+        "Mixed": "🎭",
+        "Other": "🎲"
+    }
+    
+    # Per-forum locks serializing tag creation, since each edit replaces the forum's whole tag list
+    _tag_create_locks: Dict[int, asyncio.Lock] = {}
+    
+    # (forum channel ID, lowercase tag name) -> tag, shared across modal instances
+    _tag_cache: Dict[Tuple[int, str], discord.ForumTag] = {}
+    
     def __init__(self, session_manager, reward_calculator, session_id: str, session_type: str = "Mixed"):
         super().__init__(title=f"Setup {session_type} RP Session")
         self.session_manager = session_manager
@@ -54,6 +72,11 @@ class SessionSetupModal(discord.ui.Modal):
             # Use preset session type
             session_type = self.preset_session_type
             
+            # Read each input once
+            session_name = self.session_name.value
+            session_description = self.session_description.value
+            map_link = self.map_link.value.strip()
+            
             # Parse max players
             max_players_value = None
             try:
@@ -84,36 +107,39 @@ class SessionSetupModal(discord.ui.Modal):
                     reason="Created for RP session management"
                 )
             
+            thread_name = f"{session_name} ({session_type})"[:100]  # Discord thread name limit
+            welcome_message = f"Welcome to **{session_name}**!\n\n{session_description}\n\nUse the controls below to join the session."
+            
             # Handle forum channels (create forum post) or text channels (create thread)
             if isinstance(rp_sessions_channel, discord.ForumChannel):
                 # Create forum post for session
-                thread_name = f"{self.session_name.value} ({session_type})"
-                
-                # Get or create tags for the forum
-                session_type_tag = await self._get_or_create_forum_tag(rp_sessions_channel, session_type, self._get_session_type_emoji(session_type))
-                active_tag = await self._get_or_create_forum_tag(rp_sessions_channel, "Active", "🟢")
-                accepting_tag = await self._get_or_create_forum_tag(rp_sessions_channel, "Accepting Players", "🟢")
+                # Get or create tags for the forum, adding any missing ones together
+                session_type_tag, active_tag, accepting_tag = await self._get_or_create_forum_tags(
+                    rp_sessions_channel,
+                    [
+                        (session_type, self._get_session_type_emoji(session_type)),
+                        ("Active", "🟢"),
+                        ("Accepting Players", "🟢")
+                    ]
+                )
                 
                 # Prepare tags for forum post (starts accepting players)
                 applied_tags = [session_type_tag, active_tag, accepting_tag]
                 
                 # Create the forum post with tags and welcome message
                 thread, message = await rp_sessions_channel.create_thread(
-                    name=thread_name[:100],  # Discord thread name limit
-                    content=f"Welcome to **{self.session_name.value}**!\n\n{self.session_description.value}\n\nUse the controls below to join the session.",
+                    name=thread_name,
+                    content=welcome_message,
                     applied_tags=applied_tags,
                     reason=f"RP Session: {self.session_id}"
                 )
                 
             elif isinstance(rp_sessions_channel, discord.TextChannel):
                 # Create thread in text channel with a starter message
-                thread_name = f"{self.session_name.value} ({session_type})"
                 # For text channels, we need to create a thread from a message
-                starter_message = await rp_sessions_channel.send(
-                    f"Welcome to **{self.session_name.value}**!\n\n{self.session_description.value}\n\nUse the controls below to join the session."
-                )
+                starter_message = await rp_sessions_channel.send(welcome_message)
                 thread = await starter_message.create_thread(
-                    name=thread_name[:100],  # Discord thread name limit
+                    name=thread_name,
                     reason=f"RP Session: {self.session_id}"
                 )
             else:
@@ -126,11 +152,11 @@ class SessionSetupModal(discord.ui.Modal):
                 session_id=self.session_id,
                 dm_id=interaction.user.id,
                 channel_id=interaction.channel_id,
-                session_name=self.session_name.value,
+                session_name=session_name,
                 session_type=session_type,
                 max_players=max_players_value,
                 thread_id=thread.id,
-                session_description=self.session_description.value
+                session_description=session_description
             )
             
             if not session:
@@ -153,8 +179,8 @@ class SessionSetupModal(discord.ui.Modal):
             
             # Post unified control panel for both forum and text channel threads
             control_embed = discord.Embed(
-                title=f"🎲 {self.session_name.value}",
-                description=f"**Description:** {self.session_description.value}\n\n**DM:** {interaction.user.mention}\n**Type:** {session_type}\n**Status:** ⚠️ Not Started",
+                title=f"🎲 {session_name}",
+                description=f"**Description:** {session_description}\n\n**DM:** {interaction.user.mention}\n**Type:** {session_type}\n**Status:** ⚠️ Not Started",
                 color=0x0099ff
             )
             
@@ -163,8 +189,8 @@ class SessionSetupModal(discord.ui.Modal):
             control_embed.add_field(name="👥 Max Players", value=f"{max_players_value}", inline=True)
             control_embed.add_field(name="⏱️ Duration", value="Not started", inline=True)
             
-            if self.map_link.value.strip():
-                control_embed.add_field(name="🗺️ Map", value=f"[View Map]({self.map_link.value.strip()})", inline=False)
+            if map_link:
+                control_embed.add_field(name="🗺️ Map", value=f"[View Map]({map_link})", inline=False)
             
             # Add standardized empty participant table
             control_embed.add_field(
@@ -181,35 +207,32 @@ class SessionSetupModal(discord.ui.Modal):
                 # Add role tags based on session type
                 role_mentions = []
                 
-                # Debug: Show all available roles
-                role_names = [role.name for role in interaction.guild.roles]
-                print(f"DEBUG: Available roles: {role_names}")
+                # Index roles by lowercase name once (first match wins, as with utils.find)
+                roles_by_lower = {}
+                for role in interaction.guild.roles:
+                    roles_by_lower.setdefault(role.name.lower(), role)
                 
                 # Find roles and create proper mentions (case-insensitive search)
                 if session_type == "Combat":
-                    combat_role = discord.utils.find(lambda r: r.name.lower() == "combat", interaction.guild.roles)
-                    print(f"DEBUG: Combat role found: {combat_role}")
+                    combat_role = roles_by_lower.get("combat")
                     if combat_role:
                         role_mentions.append(f"<@&{combat_role.id}>")
                 elif session_type == "Social":
-                    social_role = discord.utils.find(lambda r: r.name.lower() == "social", interaction.guild.roles)
-                    print(f"DEBUG: Social role found: {social_role}")
+                    social_role = roles_by_lower.get("social")
                     if social_role:
                         role_mentions.append(f"<@&{social_role.id}>")
                 elif session_type == "Mixed":
-                    combat_role = discord.utils.find(lambda r: r.name.lower() == "combat", interaction.guild.roles)
-                    social_role = discord.utils.find(lambda r: r.name.lower() == "social", interaction.guild.roles)
-                    print(f"DEBUG: Combat role found: {combat_role}, Social role found: {social_role}")
+                    combat_role = roles_by_lower.get("combat")
+                    social_role = roles_by_lower.get("social")
                     if combat_role:
                         role_mentions.append(f"<@&{combat_role.id}>")
                     if social_role:
                         role_mentions.append(f"<@&{social_role.id}>")
                 
-                print(f"DEBUG: Final role mentions: {role_mentions}")
                 # Other type gets no role mentions
                 
                 # Build clean session description 
-                description = f"**{self.session_name.value}**\n{self.session_description.value}"
+                description = f"**{session_name}**\n{session_description}"
                 
                 link_embed = discord.Embed(
                     title="🔔 New RP Session Started!",
@@ -220,8 +243,8 @@ class SessionSetupModal(discord.ui.Modal):
                 link_embed.add_field(name="DM", value=interaction.user.mention, inline=True)
                 link_embed.add_field(name="Join Session", value=f"[Click Here]({thread.jump_url})", inline=False)
                 
-                if self.map_link.value.strip():
-                    link_embed.add_field(name="Map", value=f"[View Map]({self.map_link.value.strip()})", inline=True)
+                if map_link:
+                    link_embed.add_field(name="Map", value=f"[View Map]({map_link})", inline=True)
                 
                 # Send role mentions as separate content above the embed (this will ping users)
                 if role_mentions:
@@ -232,7 +255,7 @@ class SessionSetupModal(discord.ui.Modal):
             
             # Respond to the user
             success_message = (
-                f"✅ Session **{self.session_name.value}** created successfully!\n"
+                f"✅ Session **{session_name}** created successfully!\n"
                 f"Thread: {thread.mention}\n"
                 f"Session ID: `{self.session_id}`\n"
                 f"🎭 RP Session Host role assigned!"
@@ -244,6 +267,8 @@ class SessionSetupModal(discord.ui.Modal):
                 await interaction.followup.send(success_message, ephemeral=True)
             
         except Exception as e:
+            # Setup failed, so free the session ID for another attempt
+            self.session_manager.release_session_id(interaction.guild_id, self.session_id)
             error_message = f"❌ Error creating session: {str(e)}"
             
             try:
@@ -254,41 +279,70 @@ class SessionSetupModal(discord.ui.Modal):
             except Exception:
                 pass  # Ignore response errors
     
-    async def _get_or_create_forum_tag(self, forum_channel: discord.ForumChannel, tag_name: str, emoji: str) -> discord.ForumTag:
-        """Get existing forum tag or create a new one"""
-        # Check if tag already exists
-        for tag in forum_channel.available_tags:
-            if tag.name.lower() == tag_name.lower():
-                return tag
+    async def _get_or_create_forum_tags(self, forum_channel: discord.ForumChannel, tag_specs: List[Tuple[str, str]]) -> List[discord.ForumTag]:
+        """Get existing forum tags, creating any missing ones in a single forum edit"""
+        tags = {tag_name: self._find_forum_tag(forum_channel, tag_name.lower()) for tag_name, _ in tag_specs}
         
-        # Create new tag if it doesn't exist and there's space (max 20 tags per forum)
-        if len(forum_channel.available_tags) < 20:
-            try:
-                # Create new tag without emoji for now (Discord API limitation)
-                new_tag = await forum_channel.create_tag(name=tag_name)
-                return new_tag
-            except discord.HTTPException:
-                # If creation fails, try to find a similar existing tag
-                for tag in forum_channel.available_tags:
-                    if tag_name.lower() in tag.name.lower():
-                        return tag
+        if any(tag is None for tag in tags.values()):
+            lock = self._tag_create_locks.setdefault(forum_channel.id, asyncio.Lock())
+            async with lock:
+                # The cached channel only sees new tags after a later gateway event, so work from a fresh copy
+                forum_channel = await forum_channel.guild.fetch_channel(forum_channel.id)
+                for tag_name in tags:
+                    if tags[tag_name] is None:
+                        tags[tag_name] = self._find_forum_tag(forum_channel, tag_name.lower())
+                
+                # Create missing tags while there's space (max 20 tags per forum)
+                missing = [tag_name for tag_name, tag in tags.items() if tag is None]
+                to_create = missing[:max(0, 20 - len(forum_channel.available_tags))]
+                if to_create:
+                    try:
+                        # Create new tags without emoji for now (Discord API limitation)
+                        new_tags = [discord.ForumTag(name=tag_name) for tag_name in to_create]
+                        edited = await forum_channel.edit(available_tags=forum_channel.available_tags + new_tags)
+                        if edited is not None:
+                            forum_channel = edited
+                        for tag_name in to_create:
+                            tags[tag_name] = self._find_forum_tag(forum_channel, tag_name.lower())
+                    except discord.HTTPException:
+                        pass
         
-        # Fallback to first available tag if we can't create new ones
-        if forum_channel.available_tags:
-            return forum_channel.available_tags[0]
+        for tag_name, tag in tags.items():
+            if tag is not None:
+                continue
+            
+            # If creation fails, try to find a similar existing tag
+            tag = next((t for t in forum_channel.available_tags if tag_name.lower() in t.name.lower()), None)
+            
+            # Fallback to first available tag if we can't create new ones
+            if tag is None and forum_channel.available_tags:
+                tag = forum_channel.available_tags[0]
+            
+            # If no tags exist, we can't apply any
+            if tag is None:
+                raise ValueError("No forum tags available and cannot create new ones")
+            tags[tag_name] = tag
+        
+        return [tags[tag_name] for tag_name, _ in tag_specs]
+    
+    def _find_forum_tag(self, forum_channel: discord.ForumChannel, tag_key: str) -> Optional[discord.ForumTag]:
+        """Find a forum tag by lowercase name, checking the tag cache before scanning the forum"""
+        cached = self._tag_cache.get((forum_channel.id, tag_key))
+        # Only trust a cached tag the forum still has
+        if cached is not None and forum_channel.get_tag(cached.id) is not None:
+            return cached
         
-        # If no tags exist, we can't apply any
-        raise ValueError("No forum tags available and cannot create new ones")
+        # Index every tag on the forum in one pass (first match wins, as with a linear scan)
+        tags_by_name: Dict[str, discord.ForumTag] = {}
+        for tag in forum_channel.available_tags:
+            tags_by_name.setdefault(tag.name.lower(), tag)
+        for name, tag in tags_by_name.items():
+            self._tag_cache[(forum_channel.id, name)] = tag
+        return tags_by_name.get(tag_key)
     
     def _get_session_type_emoji(self, session_type: str) -> str:
         """Get emoji for session type"""
-        emoji_map = {
-            "Combat": "⚔️",
-            "Social": "💬", 
-            "Mixed": "🎭",
-            "Other": "🎲"
-        }
-        return emoji_map.get(session_type, "🎲")
+        return self._SESSION_TYPE_EMOJIS.get(session_type, "🎲")
 
 
 class KickPlayerModal(discord.ui.Modal):
@@ -313,10 +367,10 @@ class KickPlayerModal(discord.ui.Modal):
             char_level = char_info.get('level', '?')
             
             option_text = f"{display_name} - {char_name} (Lv {char_level})"
-            player_options.append(f"{user_id}|{option_text}")
+            player_options.append((user_id, option_text))
         
         # Player selection dropdown (as text input since we can't use Select in Modal)
-        options_text = "\n".join([f"{i+1}. {opt.split('|')[1]}" for i, opt in enumerate(player_options)])
+        options_text = "\n".join(f"{i+1}. {option_text}" for i, (_, option_text) in enumerate(player_options))
         
         self.player_selection = discord.ui.TextInput(
             label="Select Player to Kick (Enter Number)",
@@ -358,9 +412,7 @@ class KickPlayerModal(discord.ui.Modal):
                 return
             
             # Get selected player
-            selected_option = self._player_options[selection]
-            user_id = int(selected_option.split('|')[0])
-            player_description = selected_option.split('|')[1]
+            user_id, player_description = self._player_options[selection]
             
             # Verify session and permissions
             session = self.session_manager.get_session(interaction.guild_id, self.session_id)
@@ -398,5 +450,5 @@ class KickPlayerModal(discord.ui.Modal):
                 await interaction.response.send_message("❌ Failed to remove player from session.", ephemeral=True)
                 
         except Exception as e:
-            print(f"DEBUG: Error in kick player modal: {e}")
+            logger.error(f"Error in kick player modal: {e}")
             await interaction.response.send_message(f"❌ An error occurred: {str(e)}", ephemeral=True)
\ No newline at end of file
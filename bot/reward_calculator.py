@@ -1,7 +1,57 @@
 from datetime import timedelta
+from functools import lru_cache
 from typing import Dict, Tuple, Optional
 import math
 
+@lru_cache(maxsize=4096)
+def _format_seconds(total_seconds: int) -> str:
+    """Format a whole number of seconds in the 11h55m style"""
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    
+    if hours > 0:
+        return f"{hours}h{minutes}m"
+    elif minutes > 0:
+        return f"{minutes}m"
+    else:
+        return "0m"
+
+def _round_seconds_to_30_minutes(participation_seconds: float) -> float:
+    """Round participation seconds to the nearest 30 minutes, leaving the first 30 minutes as is"""
+    whole_seconds = int(participation_seconds)
+    if whole_seconds < 1800:
+        return participation_seconds
+    # Integer rounding to the nearest 1800 seconds; exact half intervals round up
+    return (whole_seconds + 900) // 1800 * 1800
+
+def _reward_kernel(participation_seconds: float, rounded_seconds: float, is_dm: bool,
+                   long_session: bool, character_level: int, xp_per_hour: int,
+                   min_participation_minutes: int, gold_per_level_per_hour: int,
+                   dm_multiplier: float, long_session_multiplier: float) -> Tuple[int, int]:
+    """Core (xp, gold) arithmetic on plain numbers, free of attribute and object lookups"""
+    # Check minimum participation before rounding
+    if participation_seconds / 60 < min_participation_minutes:
+        return (0, 0)
+    
+    # Convert rounded participation to hours for calculation
+    hours_participated = max(0, rounded_seconds / 3600)
+    
+    # Base rewards, kept fractional until both bonuses are applied so they truncate only once
+    xp = hours_participated * xp_per_hour
+    gold = hours_participated * (character_level * gold_per_level_per_hour)
+    
+    # Apply DM bonus
+    if is_dm:
+        xp *= dm_multiplier
+        gold *= dm_multiplier
+    
+    # Apply long session bonus
+    if long_session:
+        xp *= long_session_multiplier
+        gold *= long_session_multiplier
+    
+    return (int(xp), int(gold))
+
 class RewardCalculator:
     """Calculates rewards based on session participation"""
     
@@ -18,6 +68,11 @@ class RewardCalculator:
             (17, 20): 1100  # Levels 17-20: 1100 XP/hr
         }
         
+        # Per-level XP rate table indexed by character level, built from the ranges above
+        self._xp_rate_by_level = [200] * (max(max_level for _, max_level in self.xp_rates_by_level) + 1)
+        for (min_level, max_level), xp_rate in self.xp_rates_by_level.items():
+            self._xp_rate_by_level[min_level:max_level + 1] = [xp_rate] * (max_level - min_level + 1)
+        
         # Gold rate: character level * 10 per hour
         self.gold_per_level_per_hour = 10
         
@@ -28,9 +83,8 @@ class RewardCalculator:
 
     def get_xp_rate_for_level(self, character_level: int) -> int:
         """Get XP per hour rate based on character level"""
-        for (min_level, max_level), xp_rate in self.xp_rates_by_level.items():
-            if min_level <= character_level <= max_level:
-                return xp_rate
+        if 0 <= character_level < len(self._xp_rate_by_level):
+            return self._xp_rate_by_level[character_level]
         # Default rate for level 1 or out of range
         return 200  # Base rate for level 1
 
@@ -39,17 +93,14 @@ class RewardCalculator:
         Round participation time to the nearest 30-minute interval.
         Only applies rounding after the first 30 minutes.
         """
-        total_minutes = participation_time.total_seconds() / 60
+        participation_seconds = participation_time.total_seconds()
         
         # If less than 30 minutes, no rounding - return as is
-        if total_minutes < 30:
+        if participation_seconds < 1800:
             return participation_time
         
         # After 30 minutes, round to nearest 30-minute interval
-        rounded_minutes = round(total_minutes / 30) * 30
-        
-        # Convert back to timedelta
-        return timedelta(minutes=rounded_minutes)
+        return timedelta(seconds=_round_seconds_to_30_minutes(participation_seconds))
 
     def calculate_rewards(self, participation_time: timedelta, is_dm: bool = False, 
                          session_duration: Optional[timedelta] = None, 
@@ -66,35 +117,21 @@ class RewardCalculator:
         Returns:
             Tuple of (xp, gold)
         """
-        # Check minimum participation before rounding
-        if (participation_time.total_seconds() / 60) < self.min_participation_minutes:
-            return (0, 0)
-        
-        # Round participation time to nearest 30 minutes
-        rounded_participation = self.round_to_nearest_30_minutes(participation_time)
-        
-        # Convert to hours for calculation
-        hours_participated = max(0, rounded_participation.total_seconds() / 3600)
-        
-        # Calculate level-based rewards
-        xp_per_hour = self.get_xp_rate_for_level(character_level)
-        gold_per_hour = character_level * self.gold_per_level_per_hour
-        
-        # Base rewards
-        base_xp = int(hours_participated * xp_per_hour)
-        base_gold = int(hours_participated * gold_per_hour)
-        
-        # Apply DM bonus
-        if is_dm:
-            base_xp = int(base_xp * self.dm_bonus_multiplier)
-            base_gold = int(base_gold * self.dm_bonus_multiplier)
-        
-        # Apply long session bonus
-        if session_duration and session_duration.total_seconds() / 60 >= self.long_session_bonus_threshold:
-            base_xp = int(base_xp * self.long_session_bonus_multiplier)
-            base_gold = int(base_gold * self.long_session_bonus_multiplier)
-        
-        return (base_xp, base_gold)
+        long_session = bool(session_duration) and session_duration.total_seconds() / 60 >= self.long_session_bonus_threshold
+        return self._rewards_for_seconds(participation_time.total_seconds(), is_dm, long_session, character_level)
+
+    def _rewards_for_seconds(self, participation_seconds: float, is_dm: bool,
+                             long_session: bool, character_level: int,
+                             rounded_seconds: Optional[float] = None) -> Tuple[int, int]:
+        """Calculate (xp, gold) from participation seconds and a precomputed long-session flag"""
+        if rounded_seconds is None:
+            rounded_seconds = _round_seconds_to_30_minutes(participation_seconds)
+        return _reward_kernel(
+            participation_seconds, rounded_seconds, is_dm, long_session, character_level,
+            self.get_xp_rate_for_level(character_level),
+            self.min_participation_minutes, self.gold_per_level_per_hour,
+            self.dm_bonus_multiplier, self.long_session_bonus_multiplier
+        )
 
     def calculate_session_rewards(self, session) -> Dict[int, Tuple[int, int]]:
         """
@@ -106,45 +143,59 @@ class RewardCalculator:
         Returns:
             Dict mapping user_id to (xp, gold) tuple
         """
+        # Ended sessions are frozen, so reuse the last result unless times or levels were edited
+        cache_key = None
+        if not session.is_active:
+            cache_key = (
+                session.end_time,
+                session.dm_id,
+                frozenset(session.participant_times.items()),
+                frozenset((uid, char.get('level')) for uid, char in session.participant_characters.items())
+            )
+            # Kept on the session itself, since session IDs are only unique within a guild
+            cached = session.ended_rewards_cache
+            if cached is not None and cached[0] == cache_key:
+                return dict(cached[1])
+        
         rewards = {}
-        session_duration = session.get_session_duration()
+        # The long-session bonus depends only on the session, so decide it once for everyone
+        session_minutes = session.get_session_duration().total_seconds() / 60
+        long_session = session_minutes >= self.long_session_bonus_threshold
+        dm_id = session.dm_id
+        participant_characters = session.participant_characters
+        get_seconds = session.get_participant_seconds
+        rewards_for_seconds = self._rewards_for_seconds
         
         # Calculate rewards for all participants (including those who left)
-        all_participants = set(session.participants.keys()) | set(session.participant_times.keys())
+        all_participants = session.participants.keys() | session.participant_times.keys()
         
         for user_id in all_participants:
-            participation_time = session.get_participant_time(user_id)
-            is_dm = (user_id == session.dm_id)
-            
             # Get character level, default to 1 if not found
-            character_level = 1
-            if user_id in session.participant_characters:
-                character_level = session.participant_characters[user_id]['level']
+            character = participant_characters.get(user_id)
+            character_level = character['level'] if character is not None else 1
             
-            xp, gold = self.calculate_rewards(
-                participation_time=participation_time,
-                is_dm=is_dm,
-                session_duration=session_duration,
-                character_level=character_level
+            participation_seconds = get_seconds(user_id)
+            rounded_seconds = _round_seconds_to_30_minutes(participation_seconds)
+            xp, gold = rewards_for_seconds(
+                participation_seconds,
+                user_id == dm_id,
+                long_session,
+                character_level,
+                rounded_seconds
             )
             
             if xp > 0 or gold > 0:  # Only include users who earned rewards
                 rewards[user_id] = (xp, gold)
         
+        if cache_key is not None:
+            # Store a copy so callers editing their rewards dict don't alter the cache
+            session.ended_rewards_cache = (cache_key, dict(rewards))
+        
         return rewards
 
     def format_time_duration(self, duration: timedelta) -> str:
         """Format a timedelta into a human-readable string (11h55m format)"""
-        total_seconds = int(duration.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        
-        if hours > 0:
-            return f"{hours}h{minutes}m"
-        elif minutes > 0:
-            return f"{minutes}m"
-        else:
-            return "0m"
+        return _format_seconds(int(duration.total_seconds()))
 
     def get_reward_summary_text(self, rewards: Dict[int, Tuple[int, int]], 
                                bot, session) -> str:
@@ -159,57 +210,50 @@ class RewardCalculator:
         Returns:
             Formatted reward summary string
         """
-        if not rewards:
+        if rewards:
+            # Sort by XP (highest first)
+            entries = sorted(rewards.items(), key=lambda x: x[1][0], reverse=True)
+        else:
             # Show all participants even if they didn't get rewards
-            all_participants = set(session.participants.keys()) | set(session.participant_times.keys())
-            if all_participants:
-                summary_lines = []
-                for user_id in all_participants:
-                    participation_time = session.get_participant_time(user_id)
-                    time_str = self.format_time_duration(participation_time)
-                    
-                    # Get character information
-                    character_info = ""
-                    if user_id in session.participant_characters:
-                        char_data = session.participant_characters[user_id]
-                        character_info = f" as **{char_data['name']}** (Lvl {char_data['level']})"
-                    
-                    dm_indicator = " (DM)" if user_id == session.dm_id else ""
-                    summary_lines.append(f"<@{user_id}>{dm_indicator}{character_info}: **0 XP**, **0 gold** ({time_str}) - *Below minimum time*")
-                
-                summary = "\n".join(summary_lines)
-                summary += f"\n\n**Total Distributed:** 0 XP, 0 gold\n*No participants met the minimum 30-minute requirement.*"
-                return summary
-            else:
+            all_participants = session.participants.keys() | session.participant_times.keys()
+            if not all_participants:
                 return "No participants joined this session."
+            entries = [(user_id, None) for user_id in all_participants]
+        
+        dm_id = session.dm_id
+        participant_characters = session.participant_characters
         
+        # Build every line and the totals in a single pass
         summary_lines = []
         total_xp = 0
         total_gold = 0
         
-        # Sort by XP (highest first)
-        sorted_rewards = sorted(rewards.items(), key=lambda x: x[1][0], reverse=True)
-        
-        for user_id, (xp, gold) in sorted_rewards:
-            # Get participation time
-            participation_time = session.get_participant_time(user_id)
-            rounded_participation = self.round_to_nearest_30_minutes(participation_time)
-            time_str = self.format_time_duration(rounded_participation)
-            
+        for user_id, reward in entries:
             # Check if user was DM
-            dm_indicator = " (DM)" if user_id == session.dm_id else ""
+            dm_indicator = " (DM)" if user_id == dm_id else ""
             
             # Get character information
             character_info = ""
-            if user_id in session.participant_characters:
-                char_data = session.participant_characters[user_id]
+            char_data = participant_characters.get(user_id)
+            if char_data is not None:
                 character_info = f" as **{char_data['name']}** (Lvl {char_data['level']})"
             
+            if reward is None:
+                time_str = self.format_time_duration(session.get_participant_time(user_id))
+                summary_lines.append(f"<@{user_id}>{dm_indicator}{character_info}: **0 XP**, **0 gold** ({time_str}) - *Below minimum time*")
+                continue
+            
+            # Get participation time
+            rounded_seconds = _round_seconds_to_30_minutes(session.get_participant_seconds(user_id))
+            time_str = _format_seconds(int(rounded_seconds))
+            
+            xp, gold = reward
             summary_lines.append(f"<@{user_id}>{dm_indicator}{character_info}: **{xp} XP**, **{gold} gold** ({time_str})")
             total_xp += xp
             total_gold += gold
         
-        summary = "\n".join(summary_lines)
-        summary += f"\n\n**Total Distributed:** {total_xp} XP, {total_gold} gold"
+        summary_lines.append(f"\n**Total Distributed:** {total_xp} XP, {total_gold} gold")
+        if not rewards:
+            summary_lines.append("*No participants met the minimum 30-minute requirement.*")
         
-        return summary
+        return "\n".join(summary_lines)
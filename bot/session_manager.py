@@ -1,15 +1,26 @@
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, Iterable, List, Optional, Set, Any, Tuple
 import discord
 import json
 import os
 import logging
+import tempfile
+from time import monotonic
 from database import get_db_session
 from models import GuildMember
 
 logger = logging.getLogger(__name__)
 
+# File-based session backup, used when the database is unavailable
+SESSION_BACKUP_PATH = '/tmp/sessions_backup.json'
+# Seconds of session changes coalesced into one backup write
+STORAGE_FLUSH_DELAY = 1.5
+# Seconds a session ID stays reserved while its setup view and modal are open
+SESSION_ID_RESERVATION_TTL = 1800
+# Compact encoder for the backup file, built once; one encode() call runs in C, unlike an indented json.dump
+_encode_storage = json.JSONEncoder(separators=(',', ':')).encode
+
 class RPSession:
     """Represents a roleplay session"""
     
@@ -23,23 +34,59 @@ class RPSession:
         self.thread_id = thread_id
         self.session_description = session_description
         self.start_time = None  # Will be set when session is manually started
-        self.created_time = datetime.now()  # When the session was created
+        self.created_time = self._now()  # When the session was created
         self.end_time = None
         self.pause_time = None
         self.total_paused_duration = timedelta()
         self.is_active = True
         self.is_paused = False
         self.session_started = False  # New flag to track if session timer has started
-        self.participants: Dict[int, datetime] = {}  # user_id -> join_time
-        self.participant_times: Dict[int, timedelta] = {}  # user_id -> total_time
+        # Participation is tracked as plain floats and only turned into datetime/timedelta at the API boundary
+        self.participants: Dict[int, float] = {}  # user_id -> join time as a POSIX timestamp
+        self.participant_times: Dict[int, float] = {}  # user_id -> total seconds before the current join
         self.participant_characters: Dict[int, Dict[str, Any]] = {}  # user_id -> {'name': str, 'level': int}
         self.participant_display_names: Dict[int, str] = {}  # user_id -> display_name
+        self.unique_participant_count = 0  # users ever seen in participants or participant_times
+        self.ended_rewards_cache: Optional[Tuple[tuple, Dict[int, Tuple[int, int]]]] = None  # (state key, rewards) once ended
         self.pause_start = None
 
+    @staticmethod
+    def _now() -> datetime:
+        """Current time; read once per operation and reused for every participant"""
+        return datetime.now()
+
     def store_display_name(self, user_id: int, display_name: str):
         """Store a user's display name for later use"""
         self.participant_display_names[user_id] = display_name
     
+    def prefetch_display_names(self, guild_id: str):
+        """Load display names for every participant not yet cached in a single database query"""
+        missing = [
+            str(user_id)
+            for user_id in self.participants.keys() | self.participant_times.keys() | self.participant_characters.keys()
+            if user_id not in self.participant_display_names
+        ]
+        if not missing:
+            return
+        
+        try:
+            with get_db_session() as db_session:
+                members = db_session.query(
+                    GuildMember.user_id, GuildMember.display_name, GuildMember.username
+                ).filter(
+                    GuildMember.guild_id == str(guild_id),
+                    GuildMember.user_id.in_(missing)
+                ).all()
+        except Exception as e:
+            logger.error(f"Bulk display name lookup failed for session {self.session_id}: {e}")
+            return
+        
+        for user_id, display_name, username in members:
+            # Use display name with priority: guild display name > username
+            name = display_name or username
+            if name:
+                self.participant_display_names[int(user_id)] = name
+    
     def get_display_name(self, user_id: int, guild_id: Optional[str] = None) -> str:
         """Get display name for a user, using database lookup for better performance"""
         # First check if we have it stored in session
@@ -50,14 +97,16 @@ class RPSession:
         if guild_id:
             try:
                 with get_db_session() as db_session:
-                    member = db_session.query(GuildMember).filter(
+                    member = db_session.query(
+                        GuildMember.display_name, GuildMember.username
+                    ).filter(
                         GuildMember.guild_id == str(guild_id),
                         GuildMember.user_id == str(user_id)
                     ).first()
                     
                     if member:
-                        # Use display name with priority: nickname > global_name > username
-                        display_name = member.nickname or member.global_name or member.username
+                        # Use display name with priority: guild display name > username
+                        display_name = member.display_name or member.username
                         # Cache it for future use
                         self.participant_display_names[user_id] = display_name
                         return display_name
@@ -70,12 +119,12 @@ class RPSession:
     def start_session(self) -> bool:
         """Manually start the session timer"""
         if not self.session_started and self.is_active:
-            self.start_time = datetime.now()
+            self.start_time = self._now()
             self.session_started = True
             # Update join times for existing participants
-            current_time = self.start_time
+            start_ts = self.start_time.timestamp()
             for user_id in self.participants:
-                self.participants[user_id] = current_time
+                self.participants[user_id] = start_ts
             return True
         return False
         
@@ -90,11 +139,12 @@ class RPSession:
             if not self.session_started:
                 join_time = self.created_time
             else:
-                join_time = datetime.now() if not self.is_paused else (self.pause_start or datetime.now())
+                join_time = self.pause_start if self.is_paused and self.pause_start else self._now()
             
-            self.participants[user_id] = join_time
+            self.participants[user_id] = join_time.timestamp()
             if user_id not in self.participant_times:
-                self.participant_times[user_id] = timedelta()
+                self.participant_times[user_id] = 0.0
+                self.unique_participant_count += 1
             
             # Store character information
             if character_name and character_level is not None:
@@ -107,47 +157,51 @@ class RPSession:
 
     def remove_participant(self, user_id: int) -> bool:
         """Remove a participant from the session"""
-        if user_id in self.participants:
-            # Calculate time spent before removal
-            if not self.is_paused:
-                leave_time = datetime.now()
-                time_spent = leave_time - self.participants[user_id]
-                self.participant_times[user_id] += time_spent
-            else:
-                # If paused, calculate time up to pause
-                if self.pause_start:
-                    time_spent = self.pause_start - self.participants[user_id]
-                    self.participant_times[user_id] += time_spent
-            
-            del self.participants[user_id]
-            # Keep character info for reward calculation, don't remove it
-            return True
-        return False
+        return self.try_remove_participant(user_id) is not None
+
+    def try_remove_participant(self, user_id: int) -> Optional[timedelta]:
+        """Remove a participant and return their total time, or None if they were not in the session"""
+        join_ts = self.participants.pop(user_id, None)
+        if join_ts is None:
+            return None
+        
+        # Calculate time spent before removal
+        if not self.is_paused:
+            self.participant_times[user_id] += self._now().timestamp() - join_ts
+        elif self.pause_start:
+            # If paused, calculate time up to pause
+            self.participant_times[user_id] += self.pause_start.timestamp() - join_ts
+        
+        # Keep character info for reward calculation, don't remove it
+        return timedelta(seconds=self.participant_times[user_id])
 
     def pause_session(self):
         """Pause the session"""
         if self.is_active and not self.is_paused:
             self.is_paused = True
-            self.pause_start = datetime.now()
+            pause_start = self._now()
+            self.pause_start = pause_start
             
             # Update participant times up to pause point
-            for user_id, join_time in self.participants.items():
-                time_spent = self.pause_start - join_time
-                self.participant_times[user_id] += time_spent
-                self.participants[user_id] = self.pause_start
+            pause_ts = pause_start.timestamp()
+            participant_times = self.participant_times
+            for user_id, join_ts in self.participants.items():
+                participant_times[user_id] += pause_ts - join_ts
+                self.participants[user_id] = pause_ts
 
     def resume_session(self):
         """Resume the session"""
         if self.is_active and self.is_paused:
             self.is_paused = False
-            resume_time = datetime.now()
+            resume_time = self._now()
             
             if self.pause_start:
                 self.total_paused_duration += resume_time - self.pause_start
             
             # Update participant join times to resume time
+            resume_ts = resume_time.timestamp()
             for user_id in self.participants:
-                self.participants[user_id] = resume_time
+                self.participants[user_id] = resume_ts
             
             self.pause_start = None
 
@@ -155,15 +209,16 @@ class RPSession:
         """End the session"""
         if self.is_active:
             self.is_active = False
-            self.end_time = datetime.now()
+            self.end_time = self._now()
             
             # Calculate final times for all participants
             end_time = self.pause_start if self.is_paused else self.end_time
             
-            for user_id, join_time in self.participants.items():
-                if end_time:
-                    time_spent = end_time - join_time
-                    self.participant_times[user_id] += time_spent
+            if end_time:
+                end_ts = end_time.timestamp()
+                participant_times = self.participant_times
+                for user_id, join_ts in self.participants.items():
+                    participant_times[user_id] += end_ts - join_ts
 
     def get_session_duration(self) -> timedelta:
         """Get total session duration excluding paused time"""
@@ -176,19 +231,43 @@ class RPSession:
         elif self.is_paused and self.pause_start:
             return (self.pause_start - self.start_time) - self.total_paused_duration
         else:
-            return (datetime.now() - self.start_time) - self.total_paused_duration
+            return (self._now() - self.start_time) - self.total_paused_duration
 
-    def get_participant_time(self, user_id: int) -> timedelta:
-        """Get total time a participant has spent in the session"""
-        total_time = self.participant_times.get(user_id, timedelta())
+    def get_participant_seconds(self, user_id: int, now_ts: Optional[float] = None) -> float:
+        """Get total seconds a participant has spent in the session"""
+        total_seconds = self.participant_times.get(user_id, 0.0)
         
         # Add current active time if participant is still in session and session has started
         if user_id in self.participants and self.is_active and self.session_started:
             if not self.is_paused:
-                current_time = datetime.now() - self.participants[user_id]
-                total_time += current_time
+                if now_ts is None:
+                    now_ts = self._now().timestamp()
+                total_seconds += now_ts - self.participants[user_id]
         
-        return total_time
+        return total_seconds
+
+    def get_participant_time(self, user_id: int) -> timedelta:
+        """Get total time a participant has spent in the session"""
+        return timedelta(seconds=self.get_participant_seconds(user_id))
+    
+    def bulk_participant_snapshot(self, user_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Get character and participation time details for many participants in one pass"""
+        characters_get = self.participant_characters.get
+        get_seconds = self.get_participant_seconds
+        # One clock read shared by every participant in the snapshot
+        now_ts = self._now().timestamp()
+        empty = {}
+        snapshot = []
+        append = snapshot.append
+        for user_id in user_ids:
+            character_info = characters_get(user_id, empty)
+            append({
+                'user_id': user_id,
+                'character_name': character_info.get('name', 'Unknown'),
+                'character_level': character_info.get('level', 1),
+                'participation_time_seconds': int(get_seconds(user_id, now_ts))
+            })
+        return snapshot
     
     def is_full(self) -> bool:
         """Check if the session has reached maximum capacity"""
@@ -204,8 +283,13 @@ class SessionManager:
     def __init__(self):
         self.sessions: Dict[int, Dict[str, RPSession]] = {}  # guild_id -> {session_id -> session}
         self.active_sessions: Dict[int, Set[str]] = {}  # guild_id -> {active_session_ids}
+        self.thread_index: Dict[int, Tuple[int, str]] = {}  # thread_id -> (guild_id, session_id)
+        self.reserved_session_ids: Dict[int, Dict[str, float]] = {}  # guild_id -> {session_id handed out but not yet created -> expiry}
+        self.dm_index: Dict[Tuple[int, int], Set[str]] = {}  # (guild_id, dm_id) -> {active_session_ids}
         self.use_persistence = os.getenv('REPLIT_DEPLOYMENT') == '1'  # Only use persistence in deployment
         self.use_database = os.getenv('DATABASE_URL') is not None  # Use PostgreSQL if available
+        self._storage_dirty: Optional[asyncio.Event] = None  # set when the backup file is out of date
+        self._storage_flush_task: Optional[asyncio.Task] = None
         
         # Initialize database if available
         self.db_manager = None
@@ -228,6 +312,35 @@ class SessionManager:
             self.sessions[guild_id] = {}
             self.active_sessions[guild_id] = set()
 
+    def _index_session(self, guild_id: int, session: RPSession):
+        """Record a session's thread and DM so they can be found without scanning the guild"""
+        if session.thread_id:
+            self.thread_index[session.thread_id] = (guild_id, session.session_id)
+        if session.is_active:
+            self.dm_index.setdefault((guild_id, session.dm_id), set()).add(session.session_id)
+
+    def try_reserve_session_id(self, guild_id: int, session_id: str) -> bool:
+        """Claim a session ID for a session that is about to be set up"""
+        self.initialize_guild(guild_id)
+        now = monotonic()
+        reserved = self.reserved_session_ids.setdefault(guild_id, {})
+        
+        # Drop reservations whose setup was abandoned so they don't accumulate
+        expired = [sid for sid, expires_at in reserved.items() if expires_at <= now]
+        for sid in expired:
+            del reserved[sid]
+        
+        if session_id in reserved or session_id in self.sessions[guild_id]:
+            return False
+        reserved[session_id] = now + SESSION_ID_RESERVATION_TTL
+        return True
+
+    def release_session_id(self, guild_id: int, session_id: str):
+        """Give up a reserved session ID whose setup failed"""
+        reserved = self.reserved_session_ids.get(guild_id)
+        if reserved:
+            reserved.pop(session_id, None)
+
     def create_session(self, guild_id: int, session_id: str, dm_id: int, channel_id: int, session_name: Optional[str] = None, session_type: Optional[str] = None, max_players: Optional[int] = None, thread_id: Optional[int] = None, session_description: Optional[str] = None) -> Optional[RPSession]:
         """Create a new roleplay session"""
         self.initialize_guild(guild_id)
@@ -235,15 +348,18 @@ class SessionManager:
         if session_id in self.sessions[guild_id]:
             return None  # Session already exists
         
+        self.release_session_id(guild_id, session_id)
+        
         session = RPSession(session_id, dm_id, channel_id, session_name, session_type, max_players, thread_id, session_description)
         self.sessions[guild_id][session_id] = session
         self.active_sessions[guild_id].add(session_id)
+        self._index_session(guild_id, session)
         
         # Save state after creating session
         if self.use_database:
             self._save_session_to_database(session, guild_id)
         else:
-            self._save_sessions_to_storage()
+            self._mark_storage_dirty()
         
         return session
 
@@ -253,18 +369,21 @@ class SessionManager:
             return self.sessions[guild_id].get(session_id)
         return None
 
+    def get_session_by_thread(self, guild_id: int, thread_id: int) -> Optional[RPSession]:
+        """Get the session running in a thread"""
+        entry = self.thread_index.get(thread_id)
+        if entry is None or entry[0] != guild_id:
+            return None
+        return self.sessions[guild_id].get(entry[1])
+
     def get_active_sessions(self, guild_id: int) -> List[RPSession]:
         """Get all active sessions for a guild"""
-        if guild_id not in self.active_sessions:
+        # active_sessions only holds IDs of existing, active sessions; end_session discards them
+        session_ids = self.active_sessions.get(guild_id)
+        if not session_ids:
             return []
-        
-        active_sessions = []
-        for session_id in self.active_sessions[guild_id]:
-            session = self.sessions[guild_id].get(session_id)
-            if session and session.is_active:
-                active_sessions.append(session)
-        
-        return active_sessions
+        guild_sessions = self.sessions[guild_id]
+        return [guild_sessions[session_id] for session_id in session_ids]
 
     def end_session(self, guild_id: int, session_id: str) -> Optional[RPSession]:
         """End a session"""
@@ -273,12 +392,17 @@ class SessionManager:
             session.end_session()
             if guild_id in self.active_sessions:
                 self.active_sessions[guild_id].discard(session_id)
+            dm_sessions = self.dm_index.get((guild_id, session.dm_id))
+            if dm_sessions is not None:
+                dm_sessions.discard(session_id)
+                if not dm_sessions:
+                    del self.dm_index[(guild_id, session.dm_id)]
             
             # Save state after ending session
             if self.use_database:
                 self._save_session_to_database(session, guild_id)
             else:
-                self._save_sessions_to_storage()
+                self._mark_storage_dirty()
             return session
         return None
 
@@ -292,10 +416,7 @@ class SessionManager:
 
     def is_user_dm_of_active_session(self, guild_id: int, user_id: int) -> bool:
         """Check if user is DM of any active session"""
-        for session in self.get_active_sessions(guild_id):
-            if session.dm_id == user_id:
-                return True
-        return False
+        return (guild_id, user_id) in self.dm_index
     
     def _session_to_dict(self, session: RPSession) -> dict:
         """Convert a session to a dictionary for storage"""
@@ -313,8 +434,8 @@ class SessionManager:
             'total_paused_duration': session.total_paused_duration.total_seconds(),
             'is_active': session.is_active,
             'is_paused': session.is_paused,
-            'participants': {str(uid): dt.isoformat() for uid, dt in session.participants.items()},
-            'participant_times': {str(uid): td.total_seconds() for uid, td in session.participant_times.items()},
+            'participants': {str(uid): datetime.fromtimestamp(ts).isoformat() for uid, ts in session.participants.items()},
+            'participant_times': {str(uid): seconds for uid, seconds in session.participant_times.items()},
             'participant_characters': {str(uid): chars for uid, chars in session.participant_characters.items()},
             'pause_start': session.pause_start.isoformat() if session.pause_start else None
         }
@@ -337,13 +458,40 @@ class SessionManager:
         session.total_paused_duration = timedelta(seconds=data.get('total_paused_duration', 0))
         session.is_active = data.get('is_active', True)
         session.is_paused = data.get('is_paused', False)
-        session.participants = {int(uid): datetime.fromisoformat(dt) for uid, dt in data.get('participants', {}).items()}
-        session.participant_times = {int(uid): timedelta(seconds=seconds) for uid, seconds in data.get('participant_times', {}).items()}
+        session.participants = {int(uid): datetime.fromisoformat(dt).timestamp() for uid, dt in data.get('participants', {}).items()}
+        session.participant_times = {int(uid): float(seconds) for uid, seconds in data.get('participant_times', {}).items()}
         session.participant_characters = {int(uid): chars for uid, chars in data.get('participant_characters', {}).items()}
+        session.unique_participant_count = len(session.participants.keys() | session.participant_times.keys())
         session.pause_start = datetime.fromisoformat(data['pause_start']) if data.get('pause_start') else None
         
         return session
     
+    def _build_storage_data(self) -> dict:
+        """Snapshot all sessions into the backup file layout"""
+        storage_data = {}
+        for guild_id, guild_sessions in self.sessions.items():
+            storage_data[str(guild_id)] = {
+                'sessions': {sid: self._session_to_dict(session) for sid, session in guild_sessions.items()},
+                'active_sessions': list(self.active_sessions.get(guild_id, set()))
+            }
+        return storage_data
+    
+    @staticmethod
+    def _write_storage_file(storage_data: dict):
+        """Write the backup file atomically so a crash mid-write can't truncate it"""
+        # Each write gets its own temp file, so overlapping saves never share one
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(SESSION_BACKUP_PATH), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(_encode_storage(storage_data))
+            os.replace(temp_path, SESSION_BACKUP_PATH)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
     def _save_sessions_to_storage(self):
         """Save all sessions to persistent storage"""
         if not self.use_persistence:
@@ -351,37 +499,66 @@ class SessionManager:
             
         try:
             # Use a simple file-based storage since ReplDB might not be available
-            storage_data = {}
-            for guild_id, guild_sessions in self.sessions.items():
-                storage_data[str(guild_id)] = {
-                    'sessions': {sid: self._session_to_dict(session) for sid, session in guild_sessions.items()},
-                    'active_sessions': list(self.active_sessions.get(guild_id, set()))
-                }
-            
-            with open('/tmp/sessions_backup.json', 'w') as f:
-                json.dump(storage_data, f, indent=2)
+            self._write_storage_file(self._build_storage_data())
                 
         except Exception as e:
             print(f"Warning: Failed to save sessions to storage: {e}")
     
+    def _mark_storage_dirty(self):
+        """Schedule a coalesced background save of all sessions"""
+        if not self.use_persistence:
+            return
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop yet, so save immediately
+            self._save_sessions_to_storage()
+            return
+        
+        if self._storage_dirty is None:
+            self._storage_dirty = asyncio.Event()
+        self._storage_dirty.set()
+        if self._storage_flush_task is None or self._storage_flush_task.done():
+            self._storage_flush_task = asyncio.create_task(self._storage_flush_loop())
+    
+    async def _storage_flush_loop(self):
+        """Write the backup file once per burst of session changes"""
+        while True:
+            await self._storage_dirty.wait()
+            # Let further changes inside the window share this write
+            await asyncio.sleep(STORAGE_FLUSH_DELAY)
+            self._storage_dirty.clear()
+            
+            try:
+                # Snapshot on the event loop, then encode and write off it
+                storage_data = self._build_storage_data()
+                await asyncio.to_thread(self._write_storage_file, storage_data)
+            except Exception as e:
+                logger.warning(f"Failed to save sessions to storage: {e}")
+    
     def _load_sessions_from_storage(self):
         """Load sessions from persistent storage"""
         if not self.use_persistence:
             return
             
         try:
-            if os.path.exists('/tmp/sessions_backup.json'):
-                with open('/tmp/sessions_backup.json', 'r') as f:
+            if os.path.exists(SESSION_BACKUP_PATH):
+                with open(SESSION_BACKUP_PATH, 'r') as f:
                     storage_data = json.load(f)
                 
                 for guild_id_str, guild_data in storage_data.items():
                     guild_id = int(guild_id_str)
                     self.sessions[guild_id] = {}
-                    self.active_sessions[guild_id] = set(guild_data.get('active_sessions', []))
+                    # Rebuilt from the sessions themselves so it only ever holds live, active sessions
+                    self.active_sessions[guild_id] = set()
                     
                     for session_id, session_data in guild_data.get('sessions', {}).items():
                         session = self._dict_to_session(session_data)
                         self.sessions[guild_id][session_id] = session
+                        self._index_session(guild_id, session)
+                        if session.is_active:
+                            self.active_sessions[guild_id].add(session_id)
                         
                 print(f"Loaded {sum(len(guild_sessions) for guild_sessions in self.sessions.values())} sessions from storage")
                         
@@ -435,7 +612,7 @@ class SessionManager:
                         if participant.is_active:
                             session_data['participants'][participant.user_id] = participant.join_time
                         
-                        session_data['participant_times'][participant.user_id] = timedelta(seconds=participant.total_time_seconds)
+                        session_data['participant_times'][participant.user_id] = participant.total_time_seconds or 0
                         
                         if participant.character_name and participant.character_level:
                             session_data['participant_characters'][participant.user_id] = {
@@ -450,6 +627,7 @@ class SessionManager:
                         self.active_sessions[guild_id] = set()
                     
                     self.sessions[guild_id][session.session_id] = session
+                    self._index_session(guild_id, session)
                     if session.is_active:
                         self.active_sessions[guild_id].add(session.session_id)
                 
@@ -472,17 +650,19 @@ class SessionManager:
             session_data = self._session_to_dict(session)
             session_db_id = self.db_manager.save_session_to_db(session_data, guild_id)
             
-            # Save participants
-            for user_id, char_data in session.participant_characters.items():
-                participant_data = {
+            # Save all participants in one batch
+            participants = [
+                {
                     'user_id': user_id,
                     'character_name': char_data.get('name'),
                     'character_level': char_data.get('level'),
-                    'join_time': session.participants.get(user_id),
-                    'total_time_seconds': int(session.participant_times.get(user_id, timedelta()).total_seconds()),
+                    'join_time': datetime.fromtimestamp(session.participants[user_id]) if user_id in session.participants else None,
+                    'total_time_seconds': int(session.participant_times.get(user_id, 0)),
                     'is_active': user_id in session.participants
                 }
-                self.db_manager.save_participant_to_db(session_db_id, participant_data)
+                for user_id, char_data in session.participant_characters.items()
+            ]
+            self.db_manager.save_participants_bulk(session_db_id, participants)
                 
         except Exception as e:
             logger.error(f"Failed to save session to database: {e}")
@@ -27,107 +27,7 @@ class StatsSystem:
                     stats = PlayerStats(user_id=user_id, guild_id=guild_id)
                     db_session.add(stats)
                 
-                # Update session participation stats
-                if session_data.get('participated'):
-                    stats.total_sessions += 1
-                    
-                    # Update session type counts
-                    session_type = session_data.get('session_type', 'Other').lower()
-                    if session_type == 'combat':
-                        stats.combat_sessions += 1
-                    elif session_type == 'social':
-                        stats.social_sessions += 1
-                    elif session_type == 'mixed':
-                        stats.mixed_sessions += 1
-                    else:
-                        stats.other_sessions += 1
-                
-                # Update time stats
-                if session_data.get('time_spent_hours'):
-                    time_spent = session_data['time_spent_hours']
-                    stats.total_session_time_hours += time_spent
-                    
-                    # Update session type time breakdown
-                    session_type = session_data.get('session_type', 'Other').lower()
-                    if session_type == 'combat':
-                        stats.combat_time_hours += time_spent
-                    elif session_type == 'social':
-                        stats.social_time_hours += time_spent
-                    elif session_type == 'mixed':
-                        stats.mixed_time_hours += time_spent
-                    else:
-                        stats.other_time_hours += time_spent
-                    
-                    # Update session length metrics
-                    if time_spent > stats.longest_session_hours:
-                        stats.longest_session_hours = time_spent
-                    if time_spent < stats.shortest_session_hours:
-                        stats.shortest_session_hours = time_spent
-                
-                # Update DM stats
-                if session_data.get('was_dm'):
-                    stats.sessions_as_dm += 1
-                    if session_data.get('time_spent_hours'):
-                        stats.dm_time_hours += session_data['time_spent_hours']
-                    
-                    # Update hosted session type counts
-                    session_type = session_data.get('session_type', 'Other').lower()
-                    if session_type == 'combat':
-                        stats.sessions_hosted_combat += 1
-                    elif session_type == 'social':
-                        stats.sessions_hosted_social += 1
-                    elif session_type == 'mixed':
-                        stats.sessions_hosted_mixed += 1
-                    else:
-                        stats.sessions_hosted_other += 1
-                
-                # Update character stats
-                if session_data.get('character_level'):
-                    if session_data['character_level'] > stats.highest_character_level:
-                        stats.highest_character_level = session_data['character_level']
-                
-                if session_data.get('new_character'):
-                    stats.total_characters_played += 1
-                
-                # Update reward stats
-                if session_data.get('xp_earned'):
-                    stats.total_xp_earned += session_data['xp_earned']
-                if session_data.get('gold_earned'):
-                    stats.total_gold_earned += session_data['gold_earned']
-                
-                # Update completion stats
-                if session_data.get('completed_session'):
-                    stats.sessions_completed += 1
-                elif session_data.get('left_early'):
-                    stats.sessions_early_leave += 1
-                
-                # Update dates and streaks
-                session_date = session_data.get('session_date', datetime.utcnow())
-                if not stats.first_session_date:
-                    stats.first_session_date = session_date
-                stats.last_session_date = session_date
-                
-                # Update consecutive sessions
-                if stats.last_session_date:
-                    days_since_last = (session_date - stats.last_session_date).days
-                    if days_since_last <= 7:  # Within a week
-                        stats.consecutive_sessions += 1
-                        if stats.consecutive_sessions > stats.max_consecutive_sessions:
-                            stats.max_consecutive_sessions = stats.consecutive_sessions
-                    else:
-                        stats.consecutive_sessions = 1
-                
-                # Calculate averages
-                if stats.total_sessions > 0:
-                    stats.average_session_length_hours = stats.total_session_time_hours / stats.total_sessions
-                    stats.average_xp_per_session = stats.total_xp_earned / stats.total_sessions
-                    stats.average_gold_per_session = stats.total_gold_earned / stats.total_sessions
-                
-                # Update weekly/monthly counters
-                await self._update_time_period_stats(stats, session_date)
-                
-                # Calculate favorite session type
-                stats.favorite_session_type = self._calculate_favorite_session_type(stats)
+                await self._apply_session_stats(stats, session_data)
                 
                 db_session.commit()
                 logger.info(f"Updated stats for user {user_id} in guild {guild_id}")
@@ -135,6 +35,139 @@ class StatsSystem:
         except Exception as e:
             logger.error(f"Failed to update session stats: {e}")
     
+    async def update_session_stats_bulk(self, guild_id: str, entries: List[Tuple[str, Dict]]):
+        """Update statistics for every participant of a session in a single transaction"""
+        if not entries:
+            return
+        try:
+            with get_db_session() as db_session:
+                # Load all existing rows with one query instead of one per participant
+                user_ids = [user_id for user_id, _ in entries]
+                existing = {
+                    stats.user_id: stats
+                    for stats in db_session.query(PlayerStats).filter(
+                        and_(PlayerStats.guild_id == guild_id, PlayerStats.user_id.in_(user_ids))
+                    )
+                }
+                
+                for user_id, session_data in entries:
+                    stats = existing.get(user_id)
+                    if not stats:
+                        stats = PlayerStats(user_id=user_id, guild_id=guild_id)
+                        db_session.add(stats)
+                        existing[user_id] = stats
+                    await self._apply_session_stats(stats, session_data)
+                
+                db_session.commit()
+                logger.info(f"Updated stats for {len(entries)} users in guild {guild_id}")
+                
+        except Exception as e:
+            logger.error(f"Failed to update session stats: {e}")
+    
+    async def _apply_session_stats(self, stats: PlayerStats, session_data: Dict):
+        """Apply one session's results to a player's stats row"""
+        # Update session participation stats
+        if session_data.get('participated'):
+            stats.total_sessions += 1
+            
+            # Update session type counts
+            session_type = session_data.get('session_type', 'Other').lower()
+            if session_type == 'combat':
+                stats.combat_sessions += 1
+            elif session_type == 'social':
+                stats.social_sessions += 1
+            elif session_type == 'mixed':
+                stats.mixed_sessions += 1
+            else:
+                stats.other_sessions += 1
+        
+        # Update time stats
+        if session_data.get('time_spent_hours'):
+            time_spent = session_data['time_spent_hours']
+            stats.total_session_time_hours += time_spent
+            
+            # Update session type time breakdown
+            session_type = session_data.get('session_type', 'Other').lower()
+            if session_type == 'combat':
+                stats.combat_time_hours += time_spent
+            elif session_type == 'social':
+                stats.social_time_hours += time_spent
+            elif session_type == 'mixed':
+                stats.mixed_time_hours += time_spent
+            else:
+                stats.other_time_hours += time_spent
+            
+            # Update session length metrics
+            if time_spent > stats.longest_session_hours:
+                stats.longest_session_hours = time_spent
+            if time_spent < stats.shortest_session_hours:
+                stats.shortest_session_hours = time_spent
+        
+        # Update DM stats
+        if session_data.get('was_dm'):
+            stats.sessions_as_dm += 1
+            if session_data.get('time_spent_hours'):
+                stats.dm_time_hours += session_data['time_spent_hours']
+            
+            # Update hosted session type counts
+            session_type = session_data.get('session_type', 'Other').lower()
+            if session_type == 'combat':
+                stats.sessions_hosted_combat += 1
+            elif session_type == 'social':
+                stats.sessions_hosted_social += 1
+            elif session_type == 'mixed':
+                stats.sessions_hosted_mixed += 1
+            else:
+                stats.sessions_hosted_other += 1
+        
+        # Update character stats
+        if session_data.get('character_level'):
+            if session_data['character_level'] > stats.highest_character_level:
+                stats.highest_character_level = session_data['character_level']
+        
+        if session_data.get('new_character'):
+            stats.total_characters_played += 1
+        
+        # Update reward stats
+        if session_data.get('xp_earned'):
+            stats.total_xp_earned += session_data['xp_earned']
+        if session_data.get('gold_earned'):
+            stats.total_gold_earned += session_data['gold_earned']
+        
+        # Update completion stats
+        if session_data.get('completed_session'):
+            stats.sessions_completed += 1
+        elif session_data.get('left_early'):
+            stats.sessions_early_leave += 1
+        
+        # Update dates and streaks
+        session_date = session_data.get('session_date', datetime.utcnow())
+        if not stats.first_session_date:
+            stats.first_session_date = session_date
+        stats.last_session_date = session_date
+        
+        # Update consecutive sessions
+        if stats.last_session_date:
+            days_since_last = (session_date - stats.last_session_date).days
+            if days_since_last <= 7:  # Within a week
+                stats.consecutive_sessions += 1
+                if stats.consecutive_sessions > stats.max_consecutive_sessions:
+                    stats.max_consecutive_sessions = stats.consecutive_sessions
+            else:
+                stats.consecutive_sessions = 1
+        
+        # Calculate averages
+        if stats.total_sessions > 0:
+            stats.average_session_length_hours = stats.total_session_time_hours / stats.total_sessions
+            stats.average_xp_per_session = stats.total_xp_earned / stats.total_sessions
+            stats.average_gold_per_session = stats.total_gold_earned / stats.total_sessions
+        
+        # Update weekly/monthly counters
+        await self._update_time_period_stats(stats, session_date)
+        
+        # Calculate favorite session type
+        stats.favorite_session_type = self._calculate_favorite_session_type(stats)
+    
     async def update_alias_stats(self, user_id: str, guild_id: str, alias_data: Dict):
         """Update player statistics related to alias usage"""
         try:
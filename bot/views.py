@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands, tasks
-from typing import Optional
+from typing import Dict, Iterable, Optional
 import re
 import asyncio
 from database import get_db_session
@@ -19,13 +19,58 @@ def get_display_name_from_db(user_id: int, guild_id: str) -> Optional[str]:
             ).first()
             
             if member:
-                # Use display name with priority: display_name > global_name > username
-                return member.display_name or member.global_name or member.username
+                # Use display name with priority: guild display name > username
+                return member.display_name or member.username
     except Exception as e:
         logger.error(f"Database lookup failed for user {user_id} in guild {guild_id}: {e}")
     
     return None
 
+def get_display_names_from_db(user_ids: Iterable[int], guild_id: str) -> Dict[int, str]:
+    """Get display names for many users in a single database query"""
+    user_id_strs = [str(user_id) for user_id in user_ids]
+    if not user_id_strs:
+        return {}
+    
+    names = {}
+    try:
+        with get_db_session() as db_session:
+            members = db_session.query(
+                GuildMember.user_id, GuildMember.display_name, GuildMember.username
+            ).filter(
+                GuildMember.guild_id == str(guild_id),
+                GuildMember.user_id.in_(user_id_strs)
+            ).all()
+            
+            for user_id, display_name, username in members:
+                # Use display name with priority: guild display name > username
+                name = display_name or username
+                if name:
+                    names[int(user_id)] = name
+    except Exception as e:
+        logger.error(f"Bulk display name lookup failed in guild {guild_id}: {e}")
+    
+    return names
+
+# guild_id -> ID of the guild's rp-sessions channel
+_rp_sessions_channel_ids: Dict[int, int] = {}
+
+def get_rp_sessions_channel(guild: discord.Guild):
+    """Get the guild's rp-sessions channel, remembering its ID to skip scanning every channel"""
+    channel_id = _rp_sessions_channel_ids.get(guild.id)
+    if channel_id is not None:
+        channel = guild.get_channel(channel_id)
+        # A deleted or renamed channel falls through to a fresh lookup
+        if channel is not None and channel.name == "rp-sessions":
+            return channel
+    
+    channel = discord.utils.get(guild.channels, name="rp-sessions")
+    if channel is not None:
+        _rp_sessions_channel_ids[guild.id] = channel.id
+    else:
+        _rp_sessions_channel_ids.pop(guild.id, None)
+    return channel
+
 async def update_participant_table(guild: discord.Guild, session, reward_calculator):
     """Update the participant table in the session control embed (real-time updates)"""
     if not session.thread_id or not guild:
@@ -103,7 +148,7 @@ async def _generate_rewards_table(session, reward_calculator, guild=None, calcul
         return "`Player        Character       Lv   Time   XP     Gold`\n`────────────────────────────────────────────────────────`\n`No participants yet - Use 'Join Session' to participate!`"
     
     # Combine active participants and those with recorded time
-    all_participants = set(session.participants.keys()) | set(session.participant_times.keys())
+    all_participants = session.participants.keys() | session.participant_times.keys()
     
     # Use consistent monospace formatting for proper alignment with centered headers
     table_rows = []
@@ -188,14 +233,14 @@ async def _generate_rewards_table(session, reward_calculator, guild=None, calcul
     
     return "\n".join(table_rows)
 
-async def _generate_participant_table(session, reward_calculator, guild=None):
+async def _generate_participant_table(session, reward_calculator, guild=None, display_names: Optional[Dict[int, str]] = None):
     """Generate a formatted participant table for display using wider format"""
     if not session.participants and not session.participant_times:
         # Use same format as populated table for consistency
         return "`Player        Character       Lv   Time   XP     Gold   Status`\n`──────────────────────────────────────────────────────────────`\n`No participants yet - Use 'Join Session' to participate!      `"
     
     # Combine active participants and those with recorded time
-    all_participants = set(session.participants.keys()) | set(session.participant_times.keys())
+    all_participants = session.participants.keys() | session.participant_times.keys()
     
     # Use consistent monospace formatting for proper alignment
     table_rows = []
@@ -203,12 +248,16 @@ async def _generate_participant_table(session, reward_calculator, guild=None):
     table_rows.append("`Player        Character       Lv   Time   XP     Gold   Status`")
     table_rows.append("`──────────────────────────────────────────────────────────────`")
     
+    # Resolve every player's name with one database query unless the caller already did
+    if display_names is None:
+        display_names = get_display_names_from_db(all_participants, str(guild.id)) if guild else {}
+    
     for user_id in sorted(all_participants):
         # Get display name from guild member if available
         player_name = "Unknown"
         if guild:
             # Try database lookup first (much faster)
-            db_name = get_display_name_from_db(user_id, str(guild.id))
+            db_name = display_names.get(user_id)
             if db_name:
                 player_name = db_name[:14].ljust(14)
             else:
@@ -327,7 +376,7 @@ async def update_session_capacity_tags(guild: discord.Guild, session):
     
     try:
         # Find the rp-sessions channel
-        rp_sessions_channel = discord.utils.get(guild.channels, name="rp-sessions")
+        rp_sessions_channel = get_rp_sessions_channel(guild)
         if not isinstance(rp_sessions_channel, discord.ForumChannel):
             return
         
@@ -818,6 +867,9 @@ class SessionControlView(discord.ui.View):
         
         # Show kick player modal
         from bot.modals import KickPlayerModal
+        # The modal lists every participant by name, so load the names in one query first
+        if interaction.guild_id:
+            session.prefetch_display_names(interaction.guild_id)
         modal = KickPlayerModal(self.session_manager, self.reward_calculator, self.session_id, session)
         await interaction.response.send_modal(modal)
 
@@ -863,7 +915,7 @@ class SessionControlView(discord.ui.View):
             
             embed.add_field(name="Duration", value=duration_str, inline=True)
             # Count all participants, not just those with rewards
-            all_participants = set(ended_session.participants.keys()) | set(ended_session.participant_times.keys())
+            all_participants = ended_session.participants.keys() | ended_session.participant_times.keys()
             embed.add_field(name="Participants", value=str(len(all_participants)), inline=True)
             embed.add_field(name="DM", value=f"<@{ended_session.dm_id}>", inline=True)
             
@@ -899,7 +951,7 @@ class SessionControlView(discord.ui.View):
         """Update forum post tags when session ends - remove ALL tags except 'Completed'"""
         try:
             # Find the rp-sessions channel
-            rp_sessions_channel = discord.utils.get(guild.channels, name="rp-sessions")
+            rp_sessions_channel = get_rp_sessions_channel(guild)
             if not isinstance(rp_sessions_channel, discord.ForumChannel):
                 return
             
@@ -1213,6 +1265,10 @@ class RpRewardsEditModal(discord.ui.Modal):
         if not self.rewards:
             return ""
         
+        # Load every participant's display name in one query before the per-player lookups
+        if self.guild and hasattr(self.session, 'prefetch_display_names'):
+            self.session.prefetch_display_names(str(self.guild.id))
+        
         lines = []
         for user_id, reward_data in self.rewards.items():
             if isinstance(reward_data, tuple):
@@ -1443,6 +1499,10 @@ class RewardEditModal(discord.ui.Modal):
         if not self.rewards:
             return ""  # Return empty string if no rewards
         
+        # Load every participant's display name in one query before the per-player lookups
+        if self.guild and hasattr(self.session, 'prefetch_display_names'):
+            self.session.prefetch_display_names(str(self.guild.id))
+        
         lines = []
         for user_id, reward_data in self.rewards.items():
             # Handle both tuple (xp, gold) and dict {'xp': xp, 'gold': gold} formats
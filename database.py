@@ -159,6 +159,45 @@ class DatabaseManager:
         finally:
             db.close()
     
+    def save_participants_bulk(self, session_db_id: int, participants: list):
+        """Save many participants of one session with a single lookup and commit"""
+        if not participants:
+            return
+        
+        db = self.get_session()
+        try:
+            rows = {str(data['user_id']): data for data in participants}
+            
+            # Load every existing participant row for these users in one query
+            existing = {
+                participant.user_id: participant
+                for participant in db.query(SessionParticipant).filter(
+                    SessionParticipant.session_db_id == session_db_id,
+                    SessionParticipant.user_id.in_(list(rows))
+                )
+            }
+            
+            for user_id, data in rows.items():
+                participant = existing.get(user_id)
+                if participant:
+                    # Update existing participant
+                    for key, value in data.items():
+                        if key != 'user_id' and hasattr(participant, key):
+                            setattr(participant, key, value)
+                else:
+                    # Create new participant
+                    participant_data = dict(data, user_id=user_id)
+                    db.add(SessionParticipant(session_db_id=session_db_id, **participant_data))
+            
+            db.commit()
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to save participants to database: {e}")
+            raise
+        finally:
+            db.close()
+    
     def load_active_sessions_from_db(self, guild_id: int):
         """Load all active sessions for a guild from database"""
         db = self.get_session()